@@ -1,40 +1,65 @@
 # Importing flask library
-from flask import Flask ,request, Response, globals, jsonify
+from flask import Flask, Response, jsonify, g
+from flask.json.provider import DefaultJSONProvider
+import itertools
+import orjson
+
+# Creating a JSON provider backed by orjson, which is much faster than the standard json module
+class ORJSONProvider(DefaultJSONProvider):
+    def dumps(self, obj, **kwargs):
+        # Dates and other non-native types still go through Flask's default()
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
 
 # Creating a flask object 
 app = Flask(__name__)
+# Making jsonify() use the orjson provider
+app.json = ORJSONProvider(app)
+
+# Building the static page responses once, so each request skips str encoding and content-type detection.
+# Note: these shared objects must never be modified by a handler or an after_request hook.
+HOME_RESPONSE = Response(b"Hello user! This is my first flask app", mimetype="text/plain")
+ABOUT_RESPONSE = Response(b"Hello user! This is about page", mimetype="text/plain")
+CONTACT_RESPONSE = Response(b"Hello user! This is contact page", mimetype="text/plain")
+INFORMATION_RESPONSE = Response(b"Hello user! This is information page", mimetype="text/plain")
 
 # Creating a default home page route
 @app.route("/") 
-def home():
-    return "Hello user! This is my first flask app"
+def home() -> Response:
+    return HOME_RESPONSE
 
 # Creating a about page route
 @app.route("/about")
-def about():
-    return "Hello user! This is about page"
+def about() -> Response:
+    return ABOUT_RESPONSE
 
 # Creating a contact page route
 @app.route("/contact")
-def contact():
-    return "Hello user! This is contact page"
+def contact() -> Response:
+    return CONTACT_RESPONSE
 
 # Creating a information page route
 @app.route("/information")
-def information():
-    return "Hello user! This is information page"
+def information() -> Response:
+    return INFORMATION_RESPONSE
 
 # Creating a route to get total request count
-count = 0
+# itertools.count hands out numbers atomically in C, so no global statement or lock is needed.
+# Note: each gunicorn worker process keeps its own counter.
+request_numbers = itertools.count(1)
 @app.before_request
 def request_count():
-    global count
-    count += 1
+    g.request_number = next(request_numbers)
 
 @app.route("/traffic/counter", methods=["GET"])
 def request_counter() -> Response:
     return jsonify({
-        "Total_Requests" : count
+        "Total_Requests" : g.request_number
     })
     
 ## IMPORTANT NOTES AND INSTRUCTIONS
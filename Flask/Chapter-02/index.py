@@ -1,4 +1,4 @@
-from flask import Flask, request, Response, globals, jsonify, render_template
+from flask import Flask, Response, render_template
 
 app = Flask(__name__)
 
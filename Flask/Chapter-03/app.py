@@ -1,4 +1,5 @@
-from flask import Flask , Response , redirect , render_template, Request, globals
+from flask import Flask , Response , render_template, request
+import secrets
 
 app = Flask(__name__)
 
@@ -9,13 +10,15 @@ valid_users = {
     "anupama" : "anupamamn1982@gmail.com"
 }
 
-@app.route("/login")
+@app.route("/login", methods = ["GET", "POST"])
 def login() -> Response :
 
-    username = Request.form.get("username")
-    password = Request.form.get("password")
+    username = request.form.get("username")
+    password = request.form.get("password")
 
-    if(username in valid_users and password in valid_users["amogh"]):
+    # Constant-time comparison so response timing doesn't reveal how much of the password matched
+    expected = valid_users.get(username)
+    if(expected is not None and secrets.compare_digest(expected.encode(), (password or "").encode())):
         return render_template("index.html")
     else:
-        return "Invalid Credentials"
\ No newline at end of file
+        return "Invalid Credentials"
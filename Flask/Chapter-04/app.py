@@ -18,9 +18,13 @@ Prerequisites:
 Let's start with a simple Flask app that demonstrates template usage.
 """
 
-from flask import Flask, render_template, request, url_for, redirect, flash
+from flask import Flask, render_template, request, url_for, redirect, flash, session
+from flask_caching import Cache
+from jinja2 import FileSystemBytecodeCache, ModuleLoader, ChoiceLoader
+from functools import lru_cache
 from datetime import datetime
 import os
+import time
 
 # Create Flask application instance
 app = Flask(__name__)
@@ -28,6 +32,51 @@ app = Flask(__name__)
 # Secret key for flash messages (in production, use environment variables)
 app.secret_key = 'your-secret-key-here'
 
+# Cache compiled templates on disk so every worker (and every restart)
+# loads Jinja2 bytecode instead of re-parsing the template sources
+JINJA_CACHE_DIR = os.path.join(app.root_path, '.jinja_cache')
+os.makedirs(JINJA_CACHE_DIR, exist_ok=True)
+app.jinja_env.bytecode_cache = FileSystemBytecodeCache(directory=JINJA_CACHE_DIR, pattern='%s.cache')
+# Only stat template files for changes while debugging
+app.jinja_env.auto_reload = app.debug
+app.jinja_env.cache_size = 400
+
+# Memoized URL building
+# URLs are cached on (endpoint, arguments). This is only correct while the
+# host, script root and URL scheme are the same for every request, which
+# holds as long as SERVER_NAME is fixed and the app is not mounted under
+# several prefixes.
+@lru_cache(maxsize=4096)
+def _cached_url_for(endpoint, args_tuple):
+    return url_for(endpoint, **dict(args_tuple))
+
+def cached_url_for(endpoint, **values):
+    """
+    Drop-in replacement for url_for() that memoizes the built URL
+    """
+    try:
+        return _cached_url_for(endpoint, tuple(sorted(values.items())))
+    except TypeError:
+        # Unhashable argument (e.g. a list of values): build it uncached
+        return url_for(endpoint, **values)
+
+app.jinja_env.globals['url_for'] = cached_url_for
+
+# Page cache for read-only views
+# SimpleCache is per process; set CACHE_TYPE=RedisCache (and CACHE_REDIS_URL)
+# so every gunicorn worker shares the same entries.
+cache = Cache(app, config={
+    'CACHE_TYPE': os.environ.get('CACHE_TYPE', 'SimpleCache'),
+    'CACHE_REDIS_URL': os.environ.get('CACHE_REDIS_URL'),
+    'CACHE_DEFAULT_TIMEOUT': 30,
+})
+
+def has_pending_flashes():
+    """
+    Skip the page cache while a flashed message is waiting to be shown
+    """
+    return '_flashes' in session
+
 # Sample data for demonstration
 users = [
     {'id': 1, 'name': 'John Doe', 'email': 'john@example.com', 'age': 25, 'city': 'New York'},
@@ -43,6 +92,10 @@ posts = [
     {'id': 3, 'title': 'Flask Forms and Validation', 'content': 'Forms are essential for user interaction...', 'author': 'Bob Johnson', 'date': '2024-01-17'},
 ]
 
+# Index the sample data by ID for constant-time lookups
+users_by_id = {u['id']: u for u in users}
+posts_by_id = {p['id']: p for p in posts}
+
 @app.route('/')
 def index():
     """
@@ -56,6 +109,7 @@ def index():
                          user_count=len(users))
 
 @app.route('/users')
+@cache.cached(key_prefix='users_list', unless=has_pending_flashes)
 def users_list():
     """
     Route to display list of users with template loops
@@ -71,17 +125,18 @@ def user_detail(user_id):
     Demonstrates template conditionals and filters
     """
     # Find user by ID
-    user = next((u for u in users if u['id'] == user_id), None)
+    user = users_by_id.get(user_id)
     
     if not user:
         flash('User not found!', 'error')
-        return redirect(url_for('users_list'))
+        return redirect(cached_url_for('users_list'))
     
     return render_template('user_detail.html', 
                          user=user,
                          title=f"User: {user['name']}")
 
 @app.route('/posts')
+@cache.cached(key_prefix='posts_list', unless=has_pending_flashes)
 def posts_list():
     """
     Route to display blog posts with template inheritance
@@ -109,7 +164,7 @@ def contact():
             # In a real application, you would save this to a database
             print(f"Contact form submitted: {name} ({email}): {message}")
         
-        return redirect(url_for('contact'))
+        return redirect(cached_url_for('contact'))
     
     return render_template('contact.html', title='Contact Us')
 
@@ -138,7 +193,10 @@ def demo_macros():
                          title='Jinja2 Macros Demo')
 
 # Custom template filters
+# Memoized on the value: tables repeat the same dates and prices many times,
+# and datetime/number values are immutable and hashable.
 @app.template_filter('datetime')
+@lru_cache(maxsize=2048)
 def datetime_filter(value):
     """
     Custom filter to format datetime objects
@@ -149,6 +207,7 @@ def datetime_filter(value):
     return value.strftime('%Y-%m-%d %H:%M:%S')
 
 @app.template_filter('currency')
+@lru_cache(maxsize=4096)
 def currency_filter(value):
     """
     Custom filter to format currency
@@ -159,17 +218,28 @@ def currency_filter(value):
     return f"${value:.2f}"
 
 # Template context processor
+# The globals are built once; current_year is only recomputed once an hour
+# instead of calling datetime.now() on every render
+GLOBAL_TEMPLATE_VARS = {
+    'site_name': 'Flask Learning Hub',
+    'current_year': datetime.now().year,
+    'app_version': '1.0.0'
+}
+YEAR_REFRESH_SECONDS = 3600
+year_refresh_at = time.monotonic() + YEAR_REFRESH_SECONDS
+
 @app.context_processor
 def inject_global_vars():
     """
     Inject global variables into all templates
     These variables will be available in every template
     """
-    return {
-        'site_name': 'Flask Learning Hub',
-        'current_year': datetime.now().year,
-        'app_version': '1.0.0'
-    }
+    global year_refresh_at
+    now = time.monotonic()
+    if now >= year_refresh_at:
+        GLOBAL_TEMPLATE_VARS['current_year'] = datetime.now().year
+        year_refresh_at = now + YEAR_REFRESH_SECONDS
+    return GLOBAL_TEMPLATE_VARS
 
 # Error handlers
 @app.errorhandler(404)
@@ -186,12 +256,33 @@ def internal_error(error):
     """
     return render_template('errors/500.html'), 500
 
-if __name__ == '__main__':
-    # Create templates directory if it doesn't exist
-    os.makedirs('templates', exist_ok=True)
-    os.makedirs('templates/errors', exist_ok=True)
-    os.makedirs('static/css', exist_ok=True)
-    os.makedirs('static/js', exist_ok=True)
-    
-    # Run the application
-    app.run(debug=True, host='0.0.0.0', port=5000)
+# Template precompilation
+# Built by `flask compile-templates`, never at import: a broken template must not
+# stop the app from booting, and workers must not race to write the same file.
+COMPILED_TEMPLATES = os.path.join(app.root_path, '.jinja_compiled.zip')
+
+@app.cli.command('compile-templates')
+def compile_templates():
+    """
+    Compile every template into a zip of Python modules. Run it as a build
+    step (and again after editing templates); templates that fail to compile
+    are skipped and keep loading from source.
+    """
+    partial = COMPILED_TEMPLATES + '.tmp'
+    # Always compile from the template folder, even if a previous zip is loaded
+    source_env = app.jinja_env.overlay(loader=app.create_global_jinja_loader())
+    source_env.compile_templates(partial, zip='deflated', ignore_errors=True)
+    os.replace(partial, COMPILED_TEMPLATES)
+    print(f'Compiled templates written to {COMPILED_TEMPLATES}')
+
+def use_compiled_templates():
+    """
+    Load templates from the compiled zip when it exists, so workers never parse
+    template source. The template folder stays behind it as a fallback for
+    templates that were skipped or added since. Not used in debug mode.
+    """
+    if app.debug or not os.path.exists(COMPILED_TEMPLATES):
+        return
+    app.jinja_env.loader = ChoiceLoader([ModuleLoader(COMPILED_TEMPLATES), app.jinja_env.loader])
+
+use_compiled_templates()
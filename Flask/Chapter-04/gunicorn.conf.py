@@ -0,0 +1,22 @@
+"""
+Gunicorn configuration for Chapter 4
+====================================
+
+Run the application with:
+    gunicorn -c gunicorn.conf.py app:app
+"""
+
+import multiprocessing
+
+# Listen on the same address the development server used
+bind = '0.0.0.0:5000'
+
+# (2 x CPU cores) + 1 worker processes
+workers = (2 * multiprocessing.cpu_count()) + 1
+
+# Threaded workers so blocking I/O (template reads, file uploads) overlaps
+worker_class = 'gthread'
+threads = 5
+
+# Import the app once in the master so forked workers share it
+preload_app = True
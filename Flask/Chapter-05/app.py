@@ -18,24 +18,122 @@ Prerequisites:
 Let's start with a comprehensive Flask app that demonstrates form handling.
 """
 
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, send_from_directory
+from flask import Flask, Request, render_template, request, redirect, url_for, flash, jsonify, send_from_directory, session
+from flask.json.provider import DefaultJSONProvider
+from flask_caching import Cache
 from flask_wtf import FlaskForm
+from flask_wtf.csrf import generate_csrf
 from flask_wtf.file import FileField, FileRequired, FileAllowed
 from wtforms import StringField, TextAreaField, SelectField, RadioField, BooleanField, IntegerField, FloatField, DateField, PasswordField, SubmitField, HiddenField, FieldList, FormField
 from wtforms.validators import DataRequired, Email, Length, NumberRange, Optional, Regexp, EqualTo, ValidationError
 from wtforms.widgets import TextArea
+from jinja2 import FileSystemBytecodeCache, ModuleLoader, ChoiceLoader
 import os
+from functools import lru_cache
 from datetime import datetime, date
-import secrets
+from uuid import uuid4
+from werkzeug.utils import secure_filename
+import re
+import orjson
+from collections import defaultdict
+
+# JSON provider
+class ORJSONProvider(DefaultJSONProvider):
+    """JSON provider that encodes with orjson's C serializer"""
+
+    def dumps(self, obj, **kwargs):
+        # Dates and other non-native types still go through Flask's default()
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        # The session serializer passes object_hook to untag values; orjson can't take it
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
 
 # Create Flask application instance
 app = Flask(__name__)
+# Serve jsonify() responses through orjson
+app.json = ORJSONProvider(app)
 
 # Secret key for CSRF protection (in production, use environment variables)
 app.secret_key = 'your-secret-key-here'
 
+# Cache compiled templates on disk so every worker (and every restart)
+# loads Jinja2 bytecode instead of re-parsing the template sources
+JINJA_CACHE_DIR = os.path.join(app.root_path, '.jinja_cache')
+os.makedirs(JINJA_CACHE_DIR, exist_ok=True)
+app.jinja_env.bytecode_cache = FileSystemBytecodeCache(directory=JINJA_CACHE_DIR, pattern='%s.cache')
+# Only stat template files for changes while debugging
+app.jinja_env.auto_reload = app.debug
+app.jinja_env.cache_size = 400
+
+# Memoized URL building
+# URLs are cached on (endpoint, arguments). This is only correct while the
+# host, script root and URL scheme are the same for every request, which
+# holds as long as SERVER_NAME is fixed and the app is not mounted under
+# several prefixes.
+@lru_cache(maxsize=4096)
+def _cached_url_for(endpoint, args_tuple):
+    return url_for(endpoint, **dict(args_tuple))
+
+def cached_url_for(endpoint, **values):
+    """Drop-in replacement for url_for() that memoizes the built URL"""
+    try:
+        return _cached_url_for(endpoint, tuple(sorted(values.items())))
+    except TypeError:
+        # Unhashable argument (e.g. a list of values): build it uncached
+        return url_for(endpoint, **values)
+
+app.jinja_env.globals['url_for'] = cached_url_for
+
+# Page cache for read-only views
+# SimpleCache is per process; set CACHE_TYPE=RedisCache (and CACHE_REDIS_URL)
+# so every gunicorn worker shares the same entries.
+cache = Cache(app, config={
+    'CACHE_TYPE': os.environ.get('CACHE_TYPE', 'SimpleCache'),
+    'CACHE_REDIS_URL': os.environ.get('CACHE_REDIS_URL'),
+    'CACHE_DEFAULT_TIMEOUT': 30,
+})
+
+def invalidate_pages(*keys):
+    """Drop cached pages; one delete per key, since delete_many stops at the first missing one"""
+    for key in keys:
+        cache.delete(key)
+
+def has_pending_flashes():
+    """Skip the page cache while a flashed message is waiting to be shown"""
+    return '_flashes' in session
+
+# Cached blank form pages
+# The CSRF token is per session, so it is swapped for a placeholder before the
+# page is cached and a fresh token is put back in on every GET.
+CSRF_PLACEHOLDER = '__csrf_token_placeholder__'
+FORM_PAGE_TIMEOUT = 300
+
+def cached_form_page(template):
+    """Return the cached blank GET page for a form template, or None"""
+    if request.method != 'GET' or has_pending_flashes():
+        return None
+    page = cache.get(f'form_page/{template}')
+    if page is None:
+        return None
+    return page.replace(CSRF_PLACEHOLDER, generate_csrf())
+
+def render_form_page(template, form, **context):
+    """Render a form page and cache it when it is the blank GET version"""
+    page = render_template(template, form=form, **context)
+    if request.method == 'GET' and not has_pending_flashes():
+        blank_page = page.replace(form.csrf_token.current_token, CSRF_PLACEHOLDER)
+        cache.set(f'form_page/{template}', blank_page, timeout=FORM_PAGE_TIMEOUT)
+    return page
+
 # Configuration for file uploads
 UPLOAD_FOLDER = 'uploads'
+UPLOAD_DIR = os.path.abspath(UPLOAD_FOLDER)
 ALLOWED_EXTENSIONS = {'txt', 'pdf', 'png', 'jpg', 'jpeg', 'gif', 'doc', 'docx'}
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
@@ -43,10 +141,60 @@ app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 # Create upload directory if it doesn't exist
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
+class StreamingRequest(Request):
+    """Request that streams uploaded files straight into the upload directory"""
+    max_form_memory_size = 500 * 1024  # 500KB for non-file fields
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.streamed_uploads = []
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        stored_name = f"{uuid4().hex}_{secure_filename(filename or '')}"
+        stream = open(os.path.join(UPLOAD_DIR, stored_name), 'w+b')
+        self.streamed_uploads.append(stream)
+        return stream
+
+app.request_class = StreamingRequest
+
+@app.teardown_request
+def discard_unsaved_uploads(exc):
+    """Delete streamed upload files that no view kept"""
+    for stream in request.streamed_uploads:
+        stream.close()
+        os.remove(stream.name)
+
 # Sample data for demonstration
 users_data = []
 posts_data = []
 
+# Search indexes: lowercased token -> set of record IDs
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+users_by_id = {}
+posts_by_id = {}
+user_search_index = defaultdict(set)
+post_search_index = defaultdict(set)
+
+def tokenize(text):
+    """Split text into a set of lowercased alphanumeric tokens"""
+    return set(TOKEN_RE.findall(text.lower())) if text else set()
+
+def index_record(index, records_by_id, record, fields):
+    """Register a record and add its ID under every token of the given fields"""
+    records_by_id[record['id']] = record
+    for field in fields:
+        for token in tokenize(record.get(field)):
+            index[token].add(record['id'])
+
+def search_records(index, records_by_id, query):
+    """Return the records containing every token of the query, oldest first"""
+    tokens = tokenize(query)
+    if not tokens:
+        return []
+    postings = sorted((index.get(token, set()) for token in tokens), key=len)
+    ids = set.intersection(*postings)
+    return [records_by_id[record_id] for record_id in sorted(ids)]
+
 # Custom validators
 def validate_username(form, field):
     """Custom validator for username"""
@@ -60,6 +208,82 @@ def validate_age(form, field):
     if field.data > 120:
         raise ValidationError('Please enter a valid age.')
 
+# Form choices and shared validators
+# Defined once at module level so every form instance reuses the same objects
+COUNTRY_CHOICES = (
+    ('', 'Select Country'),
+    ('US', 'United States'),
+    ('CA', 'Canada'),
+    ('UK', 'United Kingdom'),
+    ('AU', 'Australia'),
+    ('DE', 'Germany'),
+    ('FR', 'France'),
+    ('JP', 'Japan'),
+    ('IN', 'India'),
+    ('BR', 'Brazil'),
+    ('MX', 'Mexico'),
+)
+
+GENDER_CHOICES = (
+    ('male', 'Male'),
+    ('female', 'Female'),
+    ('other', 'Other'),
+    ('prefer_not_to_say', 'Prefer not to say'),
+)
+
+FILE_CATEGORY_CHOICES = (
+    ('document', 'Document'),
+    ('image', 'Image'),
+    ('other', 'Other'),
+)
+
+SEARCH_CATEGORY_CHOICES = (
+    ('all', 'All'),
+    ('users', 'Users'),
+    ('posts', 'Posts'),
+    ('files', 'Files'),
+)
+
+POST_CATEGORY_CHOICES = (
+    ('general', 'General'),
+    ('technology', 'Technology'),
+    ('lifestyle', 'Lifestyle'),
+    ('travel', 'Travel'),
+    ('food', 'Food'),
+    ('sports', 'Sports'),
+)
+
+AGE_GROUP_CHOICES = (
+    ('18-25', '18-25'),
+    ('26-35', '26-35'),
+    ('36-45', '36-45'),
+    ('46-55', '46-55'),
+    ('55+', '55+'),
+)
+
+INTEREST_CHOICES = (
+    ('technology', 'Technology'),
+    ('science', 'Science'),
+    ('arts', 'Arts'),
+    ('sports', 'Sports'),
+    ('music', 'Music'),
+    ('travel', 'Travel'),
+)
+
+class FullMatch(Regexp):
+    """Regexp validator that requires the pattern to match the whole value"""
+    def __call__(self, form, field, message=None):
+        match = self.regex.fullmatch(field.data or '')
+        if match:
+            return match
+        if message is None:
+            message = self.message if self.message is not None else field.gettext('Invalid input.')
+        raise ValidationError(message)
+
+USERNAME_REGEXP = FullMatch(r'[A-Za-z0-9_]+', message='Username can only contain letters, numbers, and underscores')
+WEBSITE_REGEXP = Regexp(r'https?://', message='Must be a valid URL')
+PHONE_REGEXP = FullMatch(r'\+?1?\d{9,15}', message='Invalid phone number')
+
 # Form Definitions
 class ContactForm(FlaskForm):
     """Simple contact form"""
@@ -74,7 +298,7 @@ class UserRegistrationForm(FlaskForm):
     username = StringField('Username', validators=[
         DataRequired(), 
         Length(min=3, max=20),
-        Regexp('^[A-Za-z0-9_]+$', message='Username can only contain letters, numbers, and underscores'),
+        USERNAME_REGEXP,
         validate_username
     ])
     email = StringField('Email', validators=[DataRequired(), Email()])
@@ -87,25 +311,8 @@ class UserRegistrationForm(FlaskForm):
         EqualTo('password', message='Passwords must match')
     ])
     age = IntegerField('Age', validators=[DataRequired(), NumberRange(min=13, max=120), validate_age])
-    country = SelectField('Country', choices=[
-        ('', 'Select Country'),
-        ('US', 'United States'),
-        ('CA', 'Canada'),
-        ('UK', 'United Kingdom'),
-        ('AU', 'Australia'),
-        ('DE', 'Germany'),
-        ('FR', 'France'),
-        ('JP', 'Japan'),
-        ('IN', 'India'),
-        ('BR', 'Brazil'),
-        ('MX', 'Mexico')
-    ], validators=[DataRequired()])
-    gender = RadioField('Gender', choices=[
-        ('male', 'Male'),
-        ('female', 'Female'),
-        ('other', 'Other'),
-        ('prefer_not_to_say', 'Prefer not to say')
-    ], validators=[DataRequired()])
+    country = SelectField('Country', choices=COUNTRY_CHOICES, validators=[DataRequired()])
+    gender = RadioField('Gender', choices=GENDER_CHOICES, validators=[DataRequired()])
     newsletter = BooleanField('Subscribe to newsletter')
     terms = BooleanField('I agree to the Terms and Conditions', validators=[DataRequired()])
     submit = SubmitField('Register')
@@ -115,9 +322,9 @@ class UserProfileForm(FlaskForm):
     first_name = StringField('First Name', validators=[DataRequired(), Length(min=2, max=50)])
     last_name = StringField('Last Name', validators=[DataRequired(), Length(min=2, max=50)])
     bio = TextAreaField('Bio', validators=[Optional(), Length(max=500)])
-    website = StringField('Website', validators=[Optional(), Regexp(r'^https?://', message='Must be a valid URL')])
+    website = StringField('Website', validators=[Optional(), WEBSITE_REGEXP])
     birth_date = DateField('Birth Date', validators=[Optional()])
-    phone = StringField('Phone', validators=[Optional(), Regexp(r'^\+?1?\d{9,15}$', message='Invalid phone number')])
+    phone = StringField('Phone', validators=[Optional(), PHONE_REGEXP])
     submit = SubmitField('Update Profile')
 
 class FileUploadForm(FlaskForm):
@@ -128,36 +335,20 @@ class FileUploadForm(FlaskForm):
         FileRequired(),
         FileAllowed(ALLOWED_EXTENSIONS, 'File type not allowed!')
     ])
-    category = SelectField('Category', choices=[
-        ('document', 'Document'),
-        ('image', 'Image'),
-        ('other', 'Other')
-    ], validators=[DataRequired()])
+    category = SelectField('Category', choices=FILE_CATEGORY_CHOICES, validators=[DataRequired()])
     submit = SubmitField('Upload File')
 
 class SearchForm(FlaskForm):
     """Search form"""
     query = StringField('Search', validators=[DataRequired(), Length(min=1, max=100)])
-    category = SelectField('Category', choices=[
-        ('all', 'All'),
-        ('users', 'Users'),
-        ('posts', 'Posts'),
-        ('files', 'Files')
-    ], default='all')
+    category = SelectField('Category', choices=SEARCH_CATEGORY_CHOICES, default='all')
     submit = SubmitField('Search')
 
 class PostForm(FlaskForm):
     """Blog post form"""
     title = StringField('Title', validators=[DataRequired(), Length(min=5, max=200)])
     content = TextAreaField('Content', validators=[DataRequired(), Length(min=10, max=5000)])
-    category = SelectField('Category', choices=[
-        ('general', 'General'),
-        ('technology', 'Technology'),
-        ('lifestyle', 'Lifestyle'),
-        ('travel', 'Travel'),
-        ('food', 'Food'),
-        ('sports', 'Sports')
-    ], validators=[DataRequired()])
+    category = SelectField('Category', choices=POST_CATEGORY_CHOICES, validators=[DataRequired()])
     tags = StringField('Tags (comma-separated)', validators=[Optional()])
     is_published = BooleanField('Publish immediately')
     submit = SubmitField('Create Post')
@@ -172,21 +363,8 @@ class SurveyForm(FlaskForm):
     """Survey form with various field types"""
     name = StringField('Your Name', validators=[DataRequired()])
     email = StringField('Email', validators=[DataRequired(), Email()])
-    age_group = RadioField('Age Group', choices=[
-        ('18-25', '18-25'),
-        ('26-35', '26-35'),
-        ('36-45', '36-45'),
-        ('46-55', '46-55'),
-        ('55+', '55+')
-    ], validators=[DataRequired()])
-    interests = SelectField('Primary Interest', choices=[
-        ('technology', 'Technology'),
-        ('science', 'Science'),
-        ('arts', 'Arts'),
-        ('sports', 'Sports'),
-        ('music', 'Music'),
-        ('travel', 'Travel')
-    ], validators=[DataRequired()])
+    age_group = RadioField('Age Group', choices=AGE_GROUP_CHOICES, validators=[DataRequired()])
+    interests = SelectField('Primary Interest', choices=INTEREST_CHOICES, validators=[DataRequired()])
     rating = IntegerField('Overall Rating (1-10)', validators=[DataRequired(), NumberRange(min=1, max=10)])
     comments = TextAreaField('Additional Comments', validators=[Optional()])
     subscribe = BooleanField('Subscribe to updates')
@@ -194,6 +372,7 @@ class SurveyForm(FlaskForm):
 
 # Routes
 @app.route('/')
+@cache.cached(key_prefix='index', unless=has_pending_flashes)
 def index():
     """Home page with form examples"""
     return render_template('index.html', 
@@ -204,6 +383,10 @@ def index():
 @app.route('/contact', methods=['GET', 'POST'])
 def contact():
     """Contact form route"""
+    page = cached_form_page('forms/contact.html')
+    if page is not None:
+        return page
+    
     form = ContactForm()
     
     if form.validate_on_submit():
@@ -218,15 +401,19 @@ def contact():
         
         flash('Thank you for your message! We will get back to you soon.', 'success')
         print(f"Contact form submitted: {contact_data}")
-        return redirect(url_for('contact'))
+        return redirect(cached_url_for('contact'))
     
-    return render_template('forms/contact.html', 
-                         form=form,
-                         title='Contact Us')
+    return render_form_page('forms/contact.html', 
+                            form=form,
+                            title='Contact Us')
 
 @app.route('/register', methods=['GET', 'POST'])
 def register():
     """User registration form route"""
+    page = cached_form_page('forms/register.html')
+    if page is not None:
+        return page
+    
     form = UserRegistrationForm()
     
     if form.validate_on_submit():
@@ -243,12 +430,14 @@ def register():
         }
         
         users_data.append(user_data)
+        index_record(user_search_index, users_by_id, user_data, ('username', 'email'))
+        invalidate_pages('index', 'users_list')
         flash(f'Registration successful! Welcome, {form.username.data}!', 'success')
-        return redirect(url_for('users_list'))
+        return redirect(cached_url_for('users_list'))
     
-    return render_template('forms/register.html', 
-                         form=form,
-                         title='User Registration')
+    return render_form_page('forms/register.html', 
+                            form=form,
+                            title='User Registration')
 
 @app.route('/profile', methods=['GET', 'POST'])
 def profile():
@@ -269,7 +458,7 @@ def profile():
         
         flash('Profile updated successfully!', 'success')
         print(f"Profile updated: {profile_data}")
-        return redirect(url_for('profile'))
+        return redirect(cached_url_for('profile'))
     
     return render_template('forms/profile.html', 
                          form=form,
@@ -283,9 +472,11 @@ def upload():
     if form.validate_on_submit():
         # Process file upload
         file = form.file.data
-        filename = f"{secrets.token_hex(8)}_{file.filename}"
-        file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(file_path)
+        # The body was already streamed into UPLOAD_DIR while parsing; keep it
+        request.streamed_uploads.remove(file.stream)
+        file_size = file.stream.seek(0, os.SEEK_END)
+        file.stream.close()
+        filename = os.path.basename(file.stream.name)
         
         upload_data = {
             'id': len(posts_data) + 1,
@@ -294,13 +485,15 @@ def upload():
             'filename': filename,
             'original_filename': file.filename,
             'category': form.category.data,
-            'file_size': os.path.getsize(file_path),
+            'file_size': file_size,
             'uploaded_at': datetime.now()
         }
         
         posts_data.append(upload_data)
+        index_record(post_search_index, posts_by_id, upload_data, ('title', 'content'))
+        invalidate_pages('index', 'posts_list', 'files_list')
         flash(f'File "{form.title.data}" uploaded successfully!', 'success')
-        return redirect(url_for('files_list'))
+        return redirect(cached_url_for('files_list'))
     
     return render_template('forms/upload.html', 
                          form=form,
@@ -313,18 +506,16 @@ def search():
     results = []
     
     if form.validate_on_submit():
-        query = form.query.data.lower()
+        query = form.query.data
         category = form.category.data
         
         if category == 'all' or category == 'users':
-            for user in users_data:
-                if query in user['username'].lower() or query in user['email'].lower():
-                    results.append({'type': 'user', 'data': user})
+            for user in search_records(user_search_index, users_by_id, query):
+                results.append({'type': 'user', 'data': user})
         
         if category == 'all' or category == 'posts':
-            for post in posts_data:
-                if query in post.get('title', '').lower() or query in post.get('content', '').lower():
-                    results.append({'type': 'post', 'data': post})
+            for post in search_records(post_search_index, posts_by_id, query):
+                results.append({'type': 'post', 'data': post})
     
     return render_template('forms/search.html', 
                          form=form,
@@ -349,8 +540,10 @@ def create_post():
         }
         
         posts_data.append(post_data)
+        index_record(post_search_index, posts_by_id, post_data, ('title', 'content'))
+        invalidate_pages('index', 'posts_list', 'files_list')
         flash(f'Post "{form.title.data}" created successfully!', 'success')
-        return redirect(url_for('posts_list'))
+        return redirect(cached_url_for('posts_list'))
     
     return render_template('forms/create_post.html', 
                          form=form,
@@ -359,6 +552,10 @@ def create_post():
 @app.route('/survey', methods=['GET', 'POST'])
 def survey():
     """Survey form route"""
+    page = cached_form_page('forms/survey.html')
+    if page is not None:
+        return page
+    
     form = SurveyForm()
     
     if form.validate_on_submit():
@@ -376,11 +573,11 @@ def survey():
         
         flash('Survey submitted successfully! Thank you for your feedback.', 'success')
         print(f"Survey submitted: {survey_data}")
-        return redirect(url_for('survey'))
+        return redirect(cached_url_for('survey'))
     
-    return render_template('forms/survey.html', 
-                         form=form,
-                         title='User Survey')
+    return render_form_page('forms/survey.html', 
+                            form=form,
+                            title='User Survey')
 
 @app.route('/dynamic', methods=['GET', 'POST'])
 def dynamic_form():
@@ -397,13 +594,14 @@ def dynamic_form():
         
         flash(f'Dynamic form "{form.name.data}" submitted with {len(form.items.data)} items!', 'success')
         print(f"Dynamic form submitted: {dynamic_data}")
-        return redirect(url_for('dynamic_form'))
+        return redirect(cached_url_for('dynamic_form'))
     
     return render_template('forms/dynamic.html', 
                          form=form,
                          title='Dynamic Form')
 
 @app.route('/users')
+@cache.cached(key_prefix='users_list', unless=has_pending_flashes)
 def users_list():
     """Display registered users"""
     return render_template('users.html', 
@@ -411,6 +609,7 @@ def users_list():
                          title='Registered Users')
 
 @app.route('/posts')
+@cache.cached(key_prefix='posts_list', unless=has_pending_flashes)
 def posts_list():
     """Display blog posts"""
     return render_template('posts.html', 
@@ -418,6 +617,7 @@ def posts_list():
                          title='Blog Posts')
 
 @app.route('/files')
+@cache.cached(key_prefix='files_list', unless=has_pending_flashes)
 def files_list():
     """Display uploaded files"""
     return render_template('files.html', 
@@ -427,7 +627,9 @@ def files_list():
 @app.route('/uploads/<filename>')
 def uploaded_file(filename):
     """Serve uploaded files"""
-    return send_from_directory(app.config['UPLOAD_FOLDER'], filename)
+    # Uploaded names are unique and never overwritten, so clients may cache them
+    # for a day and revalidate with If-None-Match / If-Modified-Since (304)
+    return send_from_directory(UPLOAD_DIR, filename, max_age=86400, conditional=True)
 
 # AJAX route for dynamic form fields
 @app.route('/api/add-field', methods=['POST'])
@@ -446,7 +648,7 @@ def add_field():
 def too_large(e):
     """Handle file too large error"""
     flash('File is too large. Maximum size is 16MB.', 'error')
-    return redirect(url_for('upload'))
+    return redirect(cached_url_for('upload'))
 
 @app.errorhandler(404)
 def not_found(error):
@@ -458,13 +660,25 @@ def internal_error(error):
     """Custom 500 error page"""
     return render_template('errors/500.html'), 500
 
-if __name__ == '__main__':
-    # Create necessary directories
-    os.makedirs('templates', exist_ok=True)
-    os.makedirs('templates/forms', exist_ok=True)
-    os.makedirs('templates/errors', exist_ok=True)
-    os.makedirs('static/css', exist_ok=True)
-    os.makedirs('static/js', exist_ok=True)
-    
-    # Run the application
-    app.run(debug=True, host='0.0.0.0', port=5000)
+# Template precompilation
+# Built by `flask compile-templates`, never at import: a broken template must not
+# stop the app from booting, and workers must not race to write the same file.
+COMPILED_TEMPLATES = os.path.join(app.root_path, '.jinja_compiled.zip')
+
+@app.cli.command('compile-templates')
+def compile_templates():
+    """Compile every template into a zip of Python modules (re-run after editing templates)"""
+    partial = COMPILED_TEMPLATES + '.tmp'
+    # Always compile from the template folder, even if a previous zip is loaded
+    source_env = app.jinja_env.overlay(loader=app.create_global_jinja_loader())
+    source_env.compile_templates(partial, zip='deflated', ignore_errors=True)
+    os.replace(partial, COMPILED_TEMPLATES)
+    print(f'Compiled templates written to {COMPILED_TEMPLATES}')
+
+def use_compiled_templates():
+    """Load templates from the compiled zip when it exists, falling back to the template folder"""
+    if app.debug or not os.path.exists(COMPILED_TEMPLATES):
+        return
+    app.jinja_env.loader = ChoiceLoader([ModuleLoader(COMPILED_TEMPLATES), app.jinja_env.loader])
+
+use_compiled_templates()
@@ -18,28 +18,86 @@ Prerequisites:
 Let's start with a comprehensive Flask app that demonstrates database integration.
 """
 
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, abort, g, has_request_context
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
+from flask_caching import Cache
 from datetime import datetime, date
 import os
-from werkzeug.security import generate_password_hash, check_password_hash
-from sqlalchemy import func, desc, asc, and_, or_, not_
-from sqlalchemy.orm import joinedload, selectinload
+import re
+import click
+import base64
+import threading
+import time
+from collections import Counter
+from werkzeug.security import check_password_hash
+from argon2 import PasswordHasher
+from argon2.exceptions import VerificationError, InvalidHashError
+from sqlalchemy import func, desc, asc, and_, or_, not_, tuple_, select, Select, insert, update, bindparam, text, event, DDL, inspect, false
+from sqlalchemy.orm import joinedload, selectinload, raiseload, load_only
+from sqlalchemy.pool import StaticPool
 
 # Create Flask application instance
 app = Flask(__name__)
 
 # Database configuration
 basedir = os.path.abspath(os.path.dirname(__file__))
-app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{os.path.join(basedir, "instance", "app.db")}'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL') or \
+    f'sqlite:///{os.path.join(basedir, "instance", "app.db")}'
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+    # Compiled SQL cache; sized above the default 500 so every view's queries stay cached
+    'query_cache_size': 1200,
+}
+
+# Connection pool settings
+if app.config['SQLALCHEMY_DATABASE_URI'] in ('sqlite://', 'sqlite:///:memory:'):
+    # One shared connection, otherwise each new connection gets an empty database
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'].update({
+        'poolclass': StaticPool,
+        'connect_args': {'check_same_thread': False},
+    })
+elif not app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+    # Reuse server connections, check them before use and retire them before the server does
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'].update({
+        'pool_size': 10,
+        'max_overflow': 20,
+        'pool_timeout': 30,
+        'pool_pre_ping': True,
+        'pool_recycle': 1800,
+    })
 app.config['SECRET_KEY'] = 'your-secret-key-here'
 
 # Initialize extensions
 db = SQLAlchemy(app)
 migrate = Migrate(app, db)
 
+# SQLite connection tuning
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """WAL journal with relaxed syncing, memory-mapped reads and a 64MB page cache"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.execute('PRAGMA mmap_size=268435456')
+    cursor.execute('PRAGMA cache_size=-65536')
+    cursor.close()
+
+with app.app_context():
+    if db.engine.dialect.name == 'sqlite':
+        event.listen(db.engine, 'connect', set_sqlite_pragmas)
+
+# Cache for values that are expensive to query and fine to serve slightly stale
+# SimpleCache is per process; set CACHE_TYPE=RedisCache (and CACHE_REDIS_URL)
+# so every worker shares the same entries.
+cache = Cache(app, config={
+    'CACHE_TYPE': os.environ.get('CACHE_TYPE', 'SimpleCache'),
+    'CACHE_REDIS_URL': os.environ.get('CACHE_REDIS_URL'),
+    'CACHE_DEFAULT_TIMEOUT': 30,
+})
+
+# Password hashing (argon2id); costs are tuned for interactive logins
+password_hasher = PasswordHasher(time_cost=2, memory_cost=65536, parallelism=2)
+
 # Database Models
 class User(db.Model):
     """User model representing users in the system"""
@@ -61,20 +119,33 @@ class User(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
-    posts = db.relationship('Post', backref='author', lazy='dynamic', cascade='all, delete-orphan')
-    comments = db.relationship('Comment', backref='author', lazy='dynamic', cascade='all, delete-orphan')
-    profile = db.relationship('UserProfile', backref='user', uselist=False, cascade='all, delete-orphan')
+    posts = db.relationship('Post', back_populates='author', lazy='select', cascade='all, delete-orphan')
+    comments = db.relationship('Comment', back_populates='author', lazy='select', cascade='all, delete-orphan')
+    profile = db.relationship('UserProfile', back_populates='user', uselist=False, cascade='all, delete-orphan')
     
     def __repr__(self):
         return f'<User {self.username}>'
     
     def set_password(self, password):
         """Set password hash"""
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
     
     def check_password(self, password):
-        """Check password hash"""
-        return check_password_hash(self.password_hash, password)
+        """Check password hash (memoized for the current request)"""
+        checks = g.setdefault('password_checks', {}) if has_request_context() else {}
+        key = (self.id, self.password_hash, hash(password))
+        if key not in checks:
+            checks[key] = self._verify_password(password)
+        return checks[key]
+    
+    def _verify_password(self, password):
+        """Verify against an argon2 hash, or a legacy werkzeug pbkdf2 hash"""
+        try:
+            return password_hasher.verify(self.password_hash, password)
+        except InvalidHashError:
+            return check_password_hash(self.password_hash, password)
+        except VerificationError:
+            return False
     
     @property
     def full_name(self):
@@ -104,6 +175,9 @@ class UserProfile(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Relationships
+    user = db.relationship('User', back_populates='profile')
+    
     def __repr__(self):
         return f'<UserProfile {self.user_id}>'
 
@@ -120,7 +194,7 @@ class Category(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Relationships
-    posts = db.relationship('Post', backref='category', lazy='dynamic')
+    posts = db.relationship('Post', back_populates='category', lazy='dynamic')
     
     def __repr__(self):
         return f'<Category {self.name}>'
@@ -139,17 +213,29 @@ class Post(db.Model):
     is_featured = db.Column(db.Boolean, default=False)
     view_count = db.Column(db.Integer, default=0)
     like_count = db.Column(db.Integer, default=0)
+    word_count = db.Column(db.Integer, default=0)  # kept in sync with content on save
     created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     published_at = db.Column(db.DateTime)
     
     # Foreign Keys
     author_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    category_id = db.Column(db.Integer, db.ForeignKey('categories.id'), nullable=False)
+    category_id = db.Column(db.Integer, db.ForeignKey('categories.id'), nullable=False, index=True)
+    
+    __table_args__ = (
+        # Keyset pagination walks (created_at, id) newest first
+        db.Index('ix_post_created_id', 'created_at', 'id'),
+        # Equality filters first, then the sort column, so filtered feeds are one range scan
+        db.Index('ix_post_pub_cat_created', is_published, category_id, created_at.desc()),
+        db.Index('ix_post_author_created', author_id, created_at.desc()),
+        db.Index('ix_post_pub_views', is_published, view_count.desc()),
+    )
     
     # Relationships
-    comments = db.relationship('Comment', backref='post', lazy='dynamic', cascade='all, delete-orphan')
-    tags = db.relationship('Tag', secondary='post_tags', backref='posts', lazy='dynamic')
+    author = db.relationship('User', back_populates='posts', lazy='joined')  # shown with every post
+    category = db.relationship('Category', back_populates='posts')
+    comments = db.relationship('Comment', back_populates='post', lazy='select', cascade='all, delete-orphan')
+    tags = db.relationship('Tag', secondary='post_tags', back_populates='posts', lazy='selectin')
     
     def __repr__(self):
         return f'<Post {self.title}>'
@@ -157,13 +243,43 @@ class Post(db.Model):
     @property
     def reading_time(self):
         """Estimate reading time in minutes"""
-        word_count = len(self.content.split())
-        return max(1, word_count // 200)  # Assume 200 words per minute
+        return max(1, (self.word_count or 0) // 200)  # Assume 200 words per minute
     
     def increment_view_count(self):
-        """Increment view count"""
-        self.view_count += 1
-        db.session.commit()
+        """Increment view count (buffered, see flush_view_counts)"""
+        record_post_view(self.id)
+
+WORD_RE = re.compile(r'\S+')
+
+@event.listens_for(Post, 'before_insert')
+@event.listens_for(Post, 'before_update')
+def update_word_count(mapper, connection, target):
+    """Recount words when content is new or changed"""
+    if inspect(target).attrs.content.history.has_changes():
+        target.word_count = sum(1 for _ in WORD_RE.finditer(target.content or ''))
+
+# Full-text index over post title/content/excerpt (SQLite FTS5)
+# An external-content table: it stores only the index and reads text from posts.
+# Triggers keep it in sync; the update trigger ignores view/like count changes.
+POSTS_FTS_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5("
+    "title, content, excerpt, content='posts', content_rowid='id')",
+    "CREATE TRIGGER posts_fts_ai AFTER INSERT ON posts BEGIN "
+    "INSERT INTO posts_fts(rowid, title, content, excerpt) "
+    "VALUES (new.id, new.title, new.content, new.excerpt); END",
+    "CREATE TRIGGER posts_fts_ad AFTER DELETE ON posts BEGIN "
+    "INSERT INTO posts_fts(posts_fts, rowid, title, content, excerpt) "
+    "VALUES ('delete', old.id, old.title, old.content, old.excerpt); END",
+    "CREATE TRIGGER posts_fts_au AFTER UPDATE OF title, content, excerpt ON posts BEGIN "
+    "INSERT INTO posts_fts(posts_fts, rowid, title, content, excerpt) "
+    "VALUES ('delete', old.id, old.title, old.content, old.excerpt); "
+    "INSERT INTO posts_fts(rowid, title, content, excerpt) "
+    "VALUES (new.id, new.title, new.content, new.excerpt); END",
+)
+
+for statement in POSTS_FTS_DDL:
+    event.listen(Post.__table__, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
+event.listen(Post.__table__, 'before_drop', DDL('DROP TABLE IF EXISTS posts_fts').execute_if(dialect='sqlite'))
 
 class Tag(db.Model):
     """Tag model for post tags"""
@@ -175,13 +291,17 @@ class Tag(db.Model):
     color = db.Column(db.String(7), default='#6c757d')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    # Relationships
+    posts = db.relationship('Post', secondary='post_tags', back_populates='tags')
+    
     def __repr__(self):
         return f'<Tag {self.name}>'
 
 # Association table for many-to-many relationship between posts and tags
 post_tags = db.Table('post_tags',
     db.Column('post_id', db.Integer, db.ForeignKey('posts.id'), primary_key=True),
-    db.Column('tag_id', db.Integer, db.ForeignKey('tags.id'), primary_key=True)
+    db.Column('tag_id', db.Integer, db.ForeignKey('tags.id'), primary_key=True),
+    db.Index('ix_post_tags_tag_id', 'tag_id')
 )
 
 class Comment(db.Model):
@@ -201,31 +321,168 @@ class Comment(db.Model):
     parent_id = db.Column(db.Integer, db.ForeignKey('comments.id'))  # For nested comments
     
     # Relationships
-    replies = db.relationship('Comment', backref=db.backref('parent', remote_side=[id]), lazy='dynamic')
+    author = db.relationship('User', back_populates='comments', lazy='joined')  # shown with every comment
+    post = db.relationship('Post', back_populates='comments')
+    parent = db.relationship('Comment', back_populates='replies', remote_side=[id])
+    replies = db.relationship('Comment', back_populates='parent', lazy='dynamic')  # rarely read
     
     def __repr__(self):
         return f'<Comment {self.id}>'
 
+# Buffered post view counts
+# Views are tallied in memory and written in one batched UPDATE at most every
+# VIEW_FLUSH_SECONDS, instead of a commit per page view.
+VIEW_FLUSH_SECONDS = 10
+pending_views = Counter()
+pending_views_lock = threading.Lock()
+views_flushed_at = time.monotonic()
+
+def record_post_view(post_id):
+    """Count one view of a post and flush the buffer when it is due"""
+    with pending_views_lock:
+        pending_views[post_id] += 1
+        due = time.monotonic() - views_flushed_at >= VIEW_FLUSH_SECONDS
+    if due:
+        flush_view_counts()
+
+def flush_view_counts():
+    """Add the buffered view counts to the posts table"""
+    global views_flushed_at
+    with pending_views_lock:
+        counts = [{'post_id': post_id, 'views': views} for post_id, views in pending_views.items()]
+        pending_views.clear()
+        views_flushed_at = time.monotonic()
+    if not counts:
+        return
+    posts = Post.__table__
+    stmt = update(posts)\
+        .where(posts.c.id == bindparam('post_id'))\
+        .values(view_count=posts.c.view_count + bindparam('views'))
+    db.session.connection().execute(stmt, counts)
+    db.session.commit()
+
+def like_pattern(term):
+    """Substring LIKE pattern for term, with LIKE wildcards in term escaped"""
+    escaped = term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f'%{escaped}%'
+
+def post_search_filter(search):
+    """Filter clause matching posts whose title, content or excerpt contain the search words"""
+    if db.engine.dialect.name == 'sqlite':
+        words = search.split()
+        if not words:
+            # MATCH '' is an FTS5 syntax error, and a search with no words matches nothing
+            return false()
+        # Every word must match, as a quoted prefix so FTS syntax in user input is inert
+        match = ' '.join('"%s"*' % word.replace('"', '""') for word in words)
+        matching_ids = text('SELECT rowid FROM posts_fts WHERE posts_fts MATCH :match')\
+            .bindparams(match=match)\
+            .columns(rowid=db.Integer)
+        return Post.id.in_(matching_ids)
+    pattern = like_pattern(search)
+    return or_(
+        Post.title.like(pattern, escape='\\'),
+        Post.content.like(pattern, escape='\\'),
+        Post.excerpt.like(pattern, escape='\\')
+    )
+
+# Keyset pagination
+# Feeds are ordered newest first. Each page seeks past the last post of the
+# previous page by (created_at, id) rather than using OFFSET, so deep pages
+# cost the same as the first one.
+class KeysetPage:
+    """One page of keyset-paginated posts"""
+    def __init__(self, items, next_cursor):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.has_next = next_cursor is not None
+
+def encode_cursor(post):
+    """Opaque cursor pointing just past a post"""
+    position = f'{post.created_at.isoformat()}|{post.id}'
+    return base64.urlsafe_b64encode(position.encode()).decode()
+
+def decode_cursor(cursor):
+    """Decode a cursor into (created_at, id), or None if it is malformed"""
+    try:
+        created_at, post_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return datetime.fromisoformat(created_at), int(post_id)
+    except ValueError:
+        return None
+
+def paginate_keyset(query, cursor, per_page):
+    """Fetch the page of posts that follows cursor (the first page if cursor is empty)
+
+    query may be an ORM query or a Core select returning rows with id and created_at.
+    """
+    position = decode_cursor(cursor) if cursor else None
+    if position:
+        query = query.filter(tuple_(Post.created_at, Post.id) < position)
+    query = query.order_by(desc(Post.created_at), desc(Post.id)).limit(per_page + 1)
+    items = db.session.execute(query).all() if isinstance(query, Select) else query.all()
+    next_cursor = encode_cursor(items[per_page - 1]) if len(items) > per_page else None
+    return KeysetPage(items[:per_page], next_cursor)
+
+# Eager loads for pages that render each post's author, category and tags
+POST_LOAD_OPTIONS = (selectinload(Post.author), selectinload(Post.category), selectinload(Post.tags))
+
+# Listing pages additionally load only the columns a post card shows
+# (content can be very large and is left unloaded)
+POST_CARD_OPTIONS = (load_only(Post.id, Post.title, Post.slug, Post.excerpt, Post.view_count,
+                               Post.word_count, Post.created_at, Post.author_id, Post.category_id),) + POST_LOAD_OPTIONS
+
+def list_load_options(*options):
+    """Loader options for list views; in debug mode any other lazy load raises"""
+    if app.debug:
+        return (*options, raiseload('*'))
+    return options
+
+@cache.cached(timeout=30, key_prefix='site_stats')
+def get_site_stats():
+    """Fetch all home page counts in a single SELECT"""
+    stmt = select(
+        select(func.count(User.id)).scalar_subquery().label('total_users'),
+        select(func.count(Post.id)).scalar_subquery().label('total_posts'),
+        select(func.count(Post.id)).where(Post.is_published == True).scalar_subquery().label('published_posts'),
+        select(func.count(Comment.id)).scalar_subquery().label('total_comments'),
+        select(func.count(Category.id)).scalar_subquery().label('total_categories'),
+        select(func.count(Tag.id)).scalar_subquery().label('total_tags')
+    )
+    return dict(db.session.execute(stmt).one()._mapping)
+
+@cache.cached(timeout=60, key_prefix='active_categories')
+def get_active_categories():
+    """Active categories for filter menus, as plain rows that are safe to cache"""
+    stmt = select(Category.id, Category.name, Category.slug, Category.color)\
+        .where(Category.is_active == True)
+    return db.session.execute(stmt).all()
+
+@cache.cached(timeout=60, key_prefix='all_tags')
+def get_all_tags():
+    """All tags for filter menus, as plain rows that are safe to cache"""
+    stmt = select(Tag.id, Tag.name, Tag.slug, Tag.color)
+    return db.session.execute(stmt).all()
+
+def invalidate_cached_lookups():
+    """Drop the cached counts and menus; one delete per key, since delete_many stops at the first missing one"""
+    for key in ('site_stats', 'active_categories', 'all_tags'):
+        cache.delete(key)
+
 # Routes
 @app.route('/')
 def index():
     """Home page with database statistics"""
-    stats = {
-        'total_users': User.query.count(),
-        'total_posts': Post.query.count(),
-        'published_posts': Post.query.filter_by(is_published=True).count(),
-        'total_comments': Comment.query.count(),
-        'total_categories': Category.query.count(),
-        'total_tags': Tag.query.count()
-    }
+    stats = get_site_stats()
     
     # Get recent posts
-    recent_posts = Post.query.filter_by(is_published=True)\
+    recent_posts = Post.query.options(*POST_CARD_OPTIONS)\
+                           .filter_by(is_published=True)\
                            .order_by(desc(Post.created_at))\
                            .limit(5).all()
     
     # Get popular posts
-    popular_posts = Post.query.filter_by(is_published=True)\
+    popular_posts = Post.query.options(*POST_CARD_OPTIONS)\
+                            .filter_by(is_published=True)\
                             .order_by(desc(Post.view_count))\
                             .limit(5).all()
     
@@ -241,7 +498,7 @@ def users_list():
     page = request.args.get('page', 1, type=int)
     per_page = 10
     
-    users = User.query.paginate(
+    users = User.query.options(*list_load_options()).paginate(
         page=page, per_page=per_page, error_out=False
     )
     
@@ -255,10 +512,8 @@ def user_detail(user_id):
     user = User.query.get_or_404(user_id)
     
     # Get user's posts with pagination
-    posts_page = request.args.get('posts_page', 1, type=int)
-    posts = Post.query.filter_by(author_id=user_id)\
-                     .order_by(desc(Post.created_at))\
-                     .paginate(page=posts_page, per_page=5, error_out=False)
+    posts_cursor = request.args.get('posts_cursor', '')
+    posts = paginate_keyset(Post.query.filter_by(author_id=user_id), posts_cursor, per_page=5)
     
     # Get user's comments
     comments = Comment.query.filter_by(author_id=user_id)\
@@ -274,33 +529,35 @@ def user_detail(user_id):
 @app.route('/posts')
 def posts_list():
     """Display all posts with filtering and pagination"""
-    page = request.args.get('page', 1, type=int)
+    cursor = request.args.get('cursor', '')
     category_id = request.args.get('category', type=int)
     tag_id = request.args.get('tag', type=int)
     search = request.args.get('search', '')
     
-    query = Post.query.filter_by(is_published=True)
+    # Plain rows with just the card columns; no ORM objects are built for a listing
+    query = select(Post.id, Post.title, Post.slug, Post.excerpt, Post.view_count,
+                   Post.word_count, Post.created_at, Post.author_id, Post.category_id,
+                   User.username.label('author_username'),
+                   Category.name.label('category_name'))\
+        .join(User, Post.author_id == User.id)\
+        .join(Category, Post.category_id == Category.id)\
+        .where(Post.is_published == True)
     
     # Apply filters
     if category_id:
-        query = query.filter_by(category_id=category_id)
+        query = query.where(Post.category_id == category_id)
     
     if tag_id:
-        query = query.join(post_tags).filter(post_tags.c.tag_id == tag_id)
+        query = query.join(post_tags, post_tags.c.post_id == Post.id).where(post_tags.c.tag_id == tag_id)
     
     if search:
-        query = query.filter(or_(
-            Post.title.contains(search),
-            Post.content.contains(search),
-            Post.excerpt.contains(search)
-        ))
+        query = query.where(post_search_filter(search))
     
-    posts = query.order_by(desc(Post.created_at))\
-                .paginate(page=page, per_page=10, error_out=False)
+    posts = paginate_keyset(query, cursor, per_page=10)
     
     # Get categories and tags for filters
-    categories = Category.query.filter_by(is_active=True).all()
-    tags = Tag.query.all()
+    categories = get_active_categories()
+    tags = get_all_tags()
     
     return render_template('posts.html',
                          posts=posts,
@@ -311,7 +568,7 @@ def posts_list():
 @app.route('/post/<int:post_id>')
 def post_detail(post_id):
     """Display post details with comments"""
-    post = Post.query.get_or_404(post_id)
+    post = Post.query.options(*POST_LOAD_OPTIONS).get_or_404(post_id)
     
     # Increment view count
     post.increment_view_count()
@@ -323,7 +580,8 @@ def post_detail(post_id):
                           .paginate(page=comments_page, per_page=10, error_out=False)
     
     # Get related posts
-    related_posts = Post.query.filter_by(category_id=post.category_id)\
+    related_posts = Post.query.options(*POST_CARD_OPTIONS)\
+                            .filter_by(category_id=post.category_id)\
                             .filter(Post.id != post_id)\
                             .filter_by(is_published=True)\
                             .limit(3).all()
@@ -337,10 +595,16 @@ def post_detail(post_id):
 @app.route('/categories')
 def categories_list():
     """Display all categories with post counts"""
-    categories = db.session.query(Category, func.count(Post.id).label('post_count'))\
-                          .outerjoin(Post)\
-                          .group_by(Category.id)\
-                          .order_by(desc('post_count')).all()
+    # Correlated count per category: one index lookup each, no scan of every post
+    post_count = select(func.count(Post.id))\
+                          .where(Post.category_id == Category.id)\
+                          .correlate(Category)\
+                          .scalar_subquery()
+    # Plain rows as a list (one per category), so the template can test, count and re-loop them
+    stmt = select(Category.id, Category.name, Category.slug, Category.description,
+                  Category.color, post_count.label('post_count'))\
+                          .order_by(desc('post_count'))
+    categories = db.session.execute(stmt).all()
     
     return render_template('categories.html',
                          categories=categories,
@@ -351,10 +615,10 @@ def category_detail(category_id):
     """Display category details with posts"""
     category = Category.query.get_or_404(category_id)
     
-    page = request.args.get('page', 1, type=int)
-    posts = Post.query.filter_by(category_id=category_id, is_published=True)\
-                    .order_by(desc(Post.created_at))\
-                    .paginate(page=page, per_page=10, error_out=False)
+    cursor = request.args.get('cursor', '')
+    query = Post.query.options(*POST_CARD_OPTIONS)\
+                    .filter_by(category_id=category_id, is_published=True)
+    posts = paginate_keyset(query, cursor, per_page=10)
     
     return render_template('category_detail.html',
                          category=category,
@@ -364,10 +628,15 @@ def category_detail(category_id):
 @app.route('/tags')
 def tags_list():
     """Display all tags with post counts"""
-    tags = db.session.query(Tag, func.count(post_tags.c.post_id).label('post_count'))\
-                    .outerjoin(post_tags)\
-                    .group_by(Tag.id)\
-                    .order_by(desc('post_count')).all()
+    # Correlated count per tag: one index lookup each, no scan of every post
+    post_count = select(func.count(post_tags.c.post_id))\
+                    .where(post_tags.c.tag_id == Tag.id)\
+                    .correlate(Tag)\
+                    .scalar_subquery()
+    # Plain rows as a list (one per tag), so the template can test, count and re-loop them
+    stmt = select(Tag.id, Tag.name, Tag.slug, Tag.color, post_count.label('post_count'))\
+                    .order_by(desc('post_count'))
+    tags = db.session.execute(stmt).all()
     
     return render_template('tags.html',
                          tags=tags,
@@ -378,12 +647,12 @@ def tag_detail(tag_id):
     """Display tag details with posts"""
     tag = Tag.query.get_or_404(tag_id)
     
-    page = request.args.get('page', 1, type=int)
-    posts = Post.query.join(post_tags)\
+    cursor = request.args.get('cursor', '')
+    query = Post.query.options(*POST_CARD_OPTIONS)\
+                    .join(post_tags)\
                     .filter(post_tags.c.tag_id == tag_id)\
-                    .filter_by(is_published=True)\
-                    .order_by(desc(Post.created_at))\
-                    .paginate(page=page, per_page=10, error_out=False)
+                    .filter_by(is_published=True)
+    posts = paginate_keyset(query, cursor, per_page=10)
     
     return render_template('tag_detail.html',
                          tag=tag,
@@ -399,21 +668,19 @@ def search():
     results = []
     if query:
         # Search posts
-        posts = Post.query.filter_by(is_published=True)\
-                        .filter(or_(
-                            Post.title.contains(query),
-                            Post.content.contains(query),
-                            Post.excerpt.contains(query)
-                        ))\
+        posts = Post.query.options(*POST_CARD_OPTIONS)\
+                        .filter_by(is_published=True)\
+                        .filter(post_search_filter(query))\
                         .order_by(desc(Post.created_at))\
                         .paginate(page=page, per_page=10, error_out=False)
         
         # Search users
+        pattern = like_pattern(query)
         users = User.query.filter(or_(
-            User.username.contains(query),
-            User.first_name.contains(query),
-            User.last_name.contains(query),
-            User.email.contains(query)
+            User.username.like(pattern, escape='\\'),
+            User.first_name.like(pattern, escape='\\'),
+            User.last_name.like(pattern, escape='\\'),
+            User.email.like(pattern, escape='\\')
         )).limit(5).all()
         
         results = {
@@ -426,127 +693,162 @@ def search():
                          results=results,
                          title='Search Results')
 
-# Database utility routes
+# Database utility functions
+# Seeding and resetting run as CLI commands (flask seed, flask reset-db) so they
+# never hold a web worker; the matching routes remain for debug-mode convenience.
+def seed_sample_data():
+    """Insert whichever sample categories, tags, users and posts are missing"""
+    # Create categories
+    categories_data = [
+        {'name': 'Technology', 'slug': 'technology', 'description': 'Tech news and tutorials', 'color': '#007bff'},
+        {'name': 'Lifestyle', 'slug': 'lifestyle', 'description': 'Life tips and advice', 'color': '#28a745'},
+        {'name': 'Travel', 'slug': 'travel', 'description': 'Travel guides and experiences', 'color': '#ffc107'},
+        {'name': 'Food', 'slug': 'food', 'description': 'Recipes and food reviews', 'color': '#dc3545'},
+        {'name': 'Sports', 'slug': 'sports', 'description': 'Sports news and analysis', 'color': '#6f42c1'}
+    ]
+    
+    existing_categories = {slug for (slug,) in db.session.query(Category.slug)}
+    new_categories = [cat_data for cat_data in categories_data
+                      if cat_data['slug'] not in existing_categories]
+    if new_categories:
+        db.session.execute(insert(Category), new_categories)
+    
+    # Create tags
+    tags_data = [
+        {'name': 'Python', 'slug': 'python', 'color': '#3776ab'},
+        {'name': 'Flask', 'slug': 'flask', 'color': '#000000'},
+        {'name': 'Web Development', 'slug': 'web-development', 'color': '#61dafb'},
+        {'name': 'Database', 'slug': 'database', 'color': '#336791'},
+        {'name': 'Tutorial', 'slug': 'tutorial', 'color': '#28a745'},
+        {'name': 'Beginner', 'slug': 'beginner', 'color': '#ffc107'},
+        {'name': 'Advanced', 'slug': 'advanced', 'color': '#dc3545'}
+    ]
+    
+    existing_tags = {slug for (slug,) in db.session.query(Tag.slug)}
+    new_tags = [tag_data for tag_data in tags_data
+                if tag_data['slug'] not in existing_tags]
+    if new_tags:
+        db.session.execute(insert(Tag), new_tags)
+    
+    # Create users
+    users_data = [
+        {
+            'username': 'john_doe',
+            'email': 'john@example.com',
+            'first_name': 'John',
+            'last_name': 'Doe',
+            'bio': 'Software developer passionate about Python and Flask',
+            'website': 'https://johndoe.dev',
+            'birth_date': date(1990, 5, 15)
+        },
+        {
+            'username': 'jane_smith',
+            'email': 'jane@example.com',
+            'first_name': 'Jane',
+            'last_name': 'Smith',
+            'bio': 'Web designer and developer',
+            'website': 'https://janesmith.design',
+            'birth_date': date(1988, 8, 22)
+        },
+        {
+            'username': 'bob_wilson',
+            'email': 'bob@example.com',
+            'first_name': 'Bob',
+            'last_name': 'Wilson',
+            'bio': 'Database administrator and Python enthusiast',
+            'birth_date': date(1985, 12, 10)
+        }
+    ]
+    
+    existing_users = {username for (username,) in db.session.query(User.username)}
+    new_users = [dict(user_data, password_hash=password_hasher.hash('password123'))
+                 for user_data in users_data
+                 if user_data['username'] not in existing_users]
+    if new_users:
+        db.session.execute(insert(User), new_users)
+    
+    # Create posts
+    category_ids = dict(db.session.query(Category.slug, Category.id))
+    user_ids = dict(db.session.query(User.username, User.id))
+    
+    posts_data = [
+        {
+            'title': 'Getting Started with Flask',
+            'slug': 'getting-started-with-flask',
+            'content': 'Flask is a micro web framework written in Python. It is classified as a microframework because it does not require particular tools or libraries...',
+            'excerpt': 'Learn the basics of Flask web framework',
+            'author_id': user_ids['john_doe'],
+            'category_id': category_ids['technology'],
+            'is_published': True,
+            'published_at': datetime.utcnow()
+        },
+        {
+            'title': 'Database Design Best Practices',
+            'slug': 'database-design-best-practices',
+            'content': 'Good database design is crucial for application performance and maintainability. Here are some best practices...',
+            'excerpt': 'Essential tips for designing efficient databases',
+            'author_id': user_ids['bob_wilson'],
+            'category_id': category_ids['technology'],
+            'is_published': True,
+            'published_at': datetime.utcnow()
+        },
+        {
+            'title': 'Healthy Lifestyle Tips',
+            'slug': 'healthy-lifestyle-tips',
+            'content': 'Maintaining a healthy lifestyle is important for overall well-being. Here are some practical tips...',
+            'excerpt': 'Simple ways to improve your daily habits',
+            'author_id': user_ids['jane_smith'],
+            'category_id': category_ids['lifestyle'],
+            'is_published': True,
+            'published_at': datetime.utcnow()
+        }
+    ]
+    
+    # Posts go through the unit of work so update_word_count runs for each one
+    existing_posts = {slug for (slug,) in db.session.query(Post.slug)}
+    db.session.add_all([Post(**post_data) for post_data in posts_data
+                        if post_data['slug'] not in existing_posts])
+    
+    db.session.commit()
+    invalidate_cached_lookups()
+
+def reset_db():
+    """Drop and recreate all tables"""
+    db.drop_all()
+    db.create_all()
+    invalidate_cached_lookups()
+
+@app.cli.command('seed')
+def seed_command():
+    """Create sample data for demonstration
+
+    This clears only this command's own cache. A running server keeps its cached
+    stats and menus for up to 60 seconds, unless CACHE_TYPE is a shared backend
+    such as RedisCache.
+    """
+    seed_sample_data()
+    click.echo('Sample data created successfully!')
+
+@app.cli.command('reset-db')
+def reset_db_command():
+    """Reset database (for development only)
+
+    This clears only this command's own cache. A running server keeps its cached
+    stats and menus for up to 60 seconds, unless CACHE_TYPE is a shared backend
+    such as RedisCache.
+    """
+    reset_db()
+    click.echo('Database reset successfully!')
+
+# Database utility routes (debug mode only)
 @app.route('/create-sample-data')
 def create_sample_data():
     """Create sample data for demonstration"""
+    if not app.debug:
+        abort(404)
     try:
-        # Create categories
-        categories_data = [
-            {'name': 'Technology', 'slug': 'technology', 'description': 'Tech news and tutorials', 'color': '#007bff'},
-            {'name': 'Lifestyle', 'slug': 'lifestyle', 'description': 'Life tips and advice', 'color': '#28a745'},
-            {'name': 'Travel', 'slug': 'travel', 'description': 'Travel guides and experiences', 'color': '#ffc107'},
-            {'name': 'Food', 'slug': 'food', 'description': 'Recipes and food reviews', 'color': '#dc3545'},
-            {'name': 'Sports', 'slug': 'sports', 'description': 'Sports news and analysis', 'color': '#6f42c1'}
-        ]
-        
-        for cat_data in categories_data:
-            if not Category.query.filter_by(slug=cat_data['slug']).first():
-                category = Category(**cat_data)
-                db.session.add(category)
-        
-        # Create tags
-        tags_data = [
-            {'name': 'Python', 'slug': 'python', 'color': '#3776ab'},
-            {'name': 'Flask', 'slug': 'flask', 'color': '#000000'},
-            {'name': 'Web Development', 'slug': 'web-development', 'color': '#61dafb'},
-            {'name': 'Database', 'slug': 'database', 'color': '#336791'},
-            {'name': 'Tutorial', 'slug': 'tutorial', 'color': '#28a745'},
-            {'name': 'Beginner', 'slug': 'beginner', 'color': '#ffc107'},
-            {'name': 'Advanced', 'slug': 'advanced', 'color': '#dc3545'}
-        ]
-        
-        for tag_data in tags_data:
-            if not Tag.query.filter_by(slug=tag_data['slug']).first():
-                tag = Tag(**tag_data)
-                db.session.add(tag)
-        
-        # Create users
-        users_data = [
-            {
-                'username': 'john_doe',
-                'email': 'john@example.com',
-                'first_name': 'John',
-                'last_name': 'Doe',
-                'bio': 'Software developer passionate about Python and Flask',
-                'website': 'https://johndoe.dev',
-                'birth_date': date(1990, 5, 15)
-            },
-            {
-                'username': 'jane_smith',
-                'email': 'jane@example.com',
-                'first_name': 'Jane',
-                'last_name': 'Smith',
-                'bio': 'Web designer and developer',
-                'website': 'https://janesmith.design',
-                'birth_date': date(1988, 8, 22)
-            },
-            {
-                'username': 'bob_wilson',
-                'email': 'bob@example.com',
-                'first_name': 'Bob',
-                'last_name': 'Wilson',
-                'bio': 'Database administrator and Python enthusiast',
-                'birth_date': date(1985, 12, 10)
-            }
-        ]
-        
-        for user_data in users_data:
-            if not User.query.filter_by(username=user_data['username']).first():
-                user = User(**user_data)
-                user.set_password('password123')
-                db.session.add(user)
-        
-        db.session.commit()
-        
-        # Create posts
-        tech_category = Category.query.filter_by(slug='technology').first()
-        lifestyle_category = Category.query.filter_by(slug='lifestyle').first()
-        john_user = User.query.filter_by(username='john_doe').first()
-        jane_user = User.query.filter_by(username='jane_smith').first()
-        
-        posts_data = [
-            {
-                'title': 'Getting Started with Flask',
-                'slug': 'getting-started-with-flask',
-                'content': 'Flask is a micro web framework written in Python. It is classified as a microframework because it does not require particular tools or libraries...',
-                'excerpt': 'Learn the basics of Flask web framework',
-                'author_id': john_user.id,
-                'category_id': tech_category.id,
-                'is_published': True,
-                'published_at': datetime.utcnow()
-            },
-            {
-                'title': 'Database Design Best Practices',
-                'slug': 'database-design-best-practices',
-                'content': 'Good database design is crucial for application performance and maintainability. Here are some best practices...',
-                'excerpt': 'Essential tips for designing efficient databases',
-                'author_id': bob_user.id if 'bob_user' in locals() else john_user.id,
-                'category_id': tech_category.id,
-                'is_published': True,
-                'published_at': datetime.utcnow()
-            },
-            {
-                'title': 'Healthy Lifestyle Tips',
-                'slug': 'healthy-lifestyle-tips',
-                'content': 'Maintaining a healthy lifestyle is important for overall well-being. Here are some practical tips...',
-                'excerpt': 'Simple ways to improve your daily habits',
-                'author_id': jane_user.id,
-                'category_id': lifestyle_category.id,
-                'is_published': True,
-                'published_at': datetime.utcnow()
-            }
-        ]
-        
-        for post_data in posts_data:
-            if not Post.query.filter_by(slug=post_data['slug']).first():
-                post = Post(**post_data)
-                db.session.add(post)
-        
-        db.session.commit()
-        
+        seed_sample_data()
         flash('Sample data created successfully!', 'success')
-        
     except Exception as e:
         db.session.rollback()
         flash(f'Error creating sample data: {str(e)}', 'error')
@@ -556,9 +858,10 @@ def create_sample_data():
 @app.route('/reset-database')
 def reset_database():
     """Reset database (for development only)"""
+    if not app.debug:
+        abort(404)
     try:
-        db.drop_all()
-        db.create_all()
+        reset_db()
         flash('Database reset successfully!', 'success')
     except Exception as e:
         flash(f'Error resetting database: {str(e)}', 'error')
@@ -578,13 +881,24 @@ def internal_error(error):
     return render_template('errors/500.html'), 500
 
 # Database context processors
+# The globals are built once; current_year is only recomputed once an hour
+# instead of calling datetime.now() on every render
+GLOBAL_TEMPLATE_VARS = {
+    'site_name': 'Flask Database Demo',
+    'current_year': datetime.now().year
+}
+YEAR_REFRESH_SECONDS = 3600
+year_refresh_at = time.monotonic() + YEAR_REFRESH_SECONDS
+
 @app.context_processor
 def inject_global_vars():
     """Inject global variables into all templates"""
-    return {
-        'site_name': 'Flask Database Demo',
-        'current_year': datetime.now().year
-    }
+    global year_refresh_at
+    now = time.monotonic()
+    if now >= year_refresh_at:
+        GLOBAL_TEMPLATE_VARS['current_year'] = datetime.now().year
+        year_refresh_at = now + YEAR_REFRESH_SECONDS
+    return GLOBAL_TEMPLATE_VARS
 
 if __name__ == '__main__':
     # Create necessary directories
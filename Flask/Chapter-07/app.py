@@ -21,43 +21,105 @@ Prerequisites:
 Let's build a complete authentication system.
 """
 
-from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify, current_app
+from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify, current_app, g, abort, \
+    Response, stream_with_context, has_app_context
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
+from flask_caching import Cache
 from flask_wtf import FlaskForm
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
 from wtforms import StringField, PasswordField, BooleanField, SubmitField, TextAreaField, SelectField
-from wtforms.validators import DataRequired, Email, Length, EqualTo, ValidationError
-from werkzeug.security import generate_password_hash, check_password_hash
+from wtforms.validators import DataRequired, Email, Length, EqualTo, Regexp, ValidationError
+from werkzeug.security import check_password_hash
+from passlib.context import CryptContext
 from datetime import datetime, timedelta
 import os
+import csv
+import io
+import hashlib
 import secrets
 import uuid
 from functools import wraps
+from sqlalchemy import event, select, insert, update, delete, func, case, not_, tuple_
+from sqlalchemy.orm import selectinload, raiseload, load_only
+from sqlalchemy.pool import NullPool
 
 # Create Flask application instance
 app = Flask(__name__)
 
 # Configuration
 basedir = os.path.abspath(os.path.dirname(__file__))
-app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{os.path.join(basedir, "instance", "auth.db")}'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL') or \
+    f'sqlite:///{os.path.join(basedir, "instance", "auth.db")}'
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+
+# Connection pool settings
+if app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+    # SQLite connections are cheap to open and writes are serialised anyway
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        'poolclass': NullPool,
+        'connect_args': {'check_same_thread': False},
+    }
+else:
+    # Sized for several threaded workers; each view holds a connection while it runs
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 20)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 30)),
+        'pool_pre_ping': True,
+        'pool_recycle': 1800,
+    }
 app.config['SECRET_KEY'] = 'your-secret-key-change-in-production'
 app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(hours=24)
 
 # Initialize extensions
 db = SQLAlchemy(app)
 migrate = Migrate(app, db)
+
+# SQLite connection tuning
+# NullPool opens a connection per checkout, so these run on every connect
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """WAL journal with relaxed syncing, enforced foreign keys and memory-backed temp storage"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.execute('PRAGMA foreign_keys=ON')
+    cursor.execute('PRAGMA temp_store=MEMORY')
+    cursor.execute('PRAGMA mmap_size=268435456')
+    cursor.close()
+
+with app.app_context():
+    if db.engine.dialect.name == 'sqlite':
+        event.listen(db.engine, 'connect', set_sqlite_pragmas)
+
 login_manager = LoginManager()
 login_manager.init_app(app)
 login_manager.login_view = 'login'
 login_manager.login_message = 'Please log in to access this page.'
 login_manager.login_message_category = 'info'
 
+# Cache for dashboard counts
+# SimpleCache is per process; set CACHE_TYPE=MemcachedCache (and a comma-separated
+# CACHE_MEMCACHED_SERVERS list) so every worker shares the same entries.
+cache = Cache(app, config={
+    'CACHE_TYPE': os.environ.get('CACHE_TYPE', 'SimpleCache'),
+    'CACHE_MEMCACHED_SERVERS': [server for server in os.environ.get('CACHE_MEMCACHED_SERVERS', '').split(',') if server],
+    'CACHE_DEFAULT_TIMEOUT': 30,
+})
+
 # User loader for Flask-Login
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    """Load the session's user with only the columns most pages need"""
+    return db.session.get(User, int(user_id), options=[load_only(*USER_SUMMARY_COLUMNS)])
+
+# Password hashing
+# argon2 for new hashes; hashes from older or deprecated schemes are upgraded on login
+pwd_context = CryptContext(
+    schemes=['argon2', 'bcrypt', 'pbkdf2_sha256'],
+    deprecated='auto',
+    argon2__rounds=3,
+    argon2__memory_cost=65536
+)
 
 # Database Models
 class User(UserMixin, db.Model):
@@ -80,21 +142,33 @@ class User(UserMixin, db.Model):
     last_login = db.Column(db.DateTime)
     login_count = db.Column(db.Integer, default=0)
     
+    __table_args__ = (
+        db.Index('ix_users_created_at_id', 'created_at', 'id'),
+    )
+    
     # Relationships
-    posts = db.relationship('Post', backref='author', lazy='dynamic')
-    comments = db.relationship('Comment', backref='author', lazy='dynamic')
-    password_resets = db.relationship('PasswordReset', backref='user', lazy='dynamic')
+    posts = db.relationship('Post', backref='author', lazy='select')
+    comments = db.relationship('Comment', backref='author', lazy='select')
+    password_resets = db.relationship('PasswordReset', backref='user', lazy='select')
     
     def __repr__(self):
         return f'<User {self.username}>'
     
     def set_password(self, password):
         """Set password hash"""
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = pwd_context.hash(password)
     
     def check_password(self, password):
-        """Check password hash"""
-        return check_password_hash(self.password_hash, password)
+        """Check password hash, replacing an outdated hash (the caller commits)"""
+        if pwd_context.identify(self.password_hash) is None:
+            # Werkzeug hash from before the switch to passlib
+            valid = check_password_hash(self.password_hash, password)
+            new_hash = pwd_context.hash(password) if valid else None
+        else:
+            valid, new_hash = pwd_context.verify_and_update(password, self.password_hash)
+        if valid and new_hash:
+            self.password_hash = new_hash
+        return valid
     
     @property
     def full_name(self):
@@ -102,10 +176,9 @@ class User(UserMixin, db.Model):
         return f"{self.first_name} {self.last_name}"
     
     def update_login_info(self):
-        """Update login information"""
+        """Update login information (the caller commits)"""
         self.last_login = datetime.utcnow()
-        self.login_count += 1
-        db.session.commit()
+        self.login_count = User.login_count + 1  # incremented in the UPDATE itself
     
     def has_role(self, role):
         """Check if user has specific role"""
@@ -141,13 +214,22 @@ class PasswordReset(db.Model):
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    token = db.Column(db.String(100), unique=True, nullable=False)
-    expires_at = db.Column(db.DateTime, nullable=False)
+    token_hash = db.Column(db.String(64), unique=True, nullable=False, index=True)  # SHA-256 of the emailed token
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
     used = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    __table_args__ = (
+        db.Index('ix_password_resets_used_expires_at', 'used', 'expires_at'),
+    )
+    
     def __repr__(self):
-        return f'<PasswordReset {self.token}>'
+        return f'<PasswordReset {self.id}>'
+    
+    @staticmethod
+    def hash_token(token):
+        """Hash a reset token for storage and lookup"""
+        return hashlib.sha256(token.encode()).hexdigest()
     
     def is_valid(self):
         """Check if token is still valid"""
@@ -167,6 +249,10 @@ class Post(db.Model):
     # Foreign Keys
     author_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     
+    __table_args__ = (
+        db.Index('ix_posts_published_created_at_id', 'is_published', 'created_at', 'id'),
+    )
+    
     def __repr__(self):
         return f'<Post {self.title}>'
 
@@ -186,6 +272,18 @@ class Comment(db.Model):
     def __repr__(self):
         return f'<Comment {self.id}>'
 
+# Columns most pages show for a user; bio, password_hash and the rest load on first access
+USER_SUMMARY_COLUMNS = (User.id, User.username, User.email, User.first_name, User.last_name,
+                        User.avatar_url, User.is_active, User.is_admin, User.created_at)
+
+# Shared validators
+# WTForms validators are stateless, so the forms share one instance of each
+USERNAME_REGEXP = Regexp(r'^[A-Za-z0-9_]+$', message='Username can only contain letters, numbers, and underscores')
+USERNAME_LENGTH = Length(min=3, max=20)
+NAME_LENGTH = Length(min=2, max=50)
+PASSWORD_LENGTH = Length(min=8, message='Password must be at least 8 characters long')
+EMAIL = Email()
+
 # Forms
 class LoginForm(FlaskForm):
     """Login form"""
@@ -196,18 +294,11 @@ class LoginForm(FlaskForm):
 
 class RegistrationForm(FlaskForm):
     """User registration form"""
-    username = StringField('Username', validators=[
-        DataRequired(), 
-        Length(min=3, max=20),
-        Regexp('^[A-Za-z0-9_]+$', message='Username can only contain letters, numbers, and underscores')
-    ])
-    email = StringField('Email', validators=[DataRequired(), Email()])
-    first_name = StringField('First Name', validators=[DataRequired(), Length(min=2, max=50)])
-    last_name = StringField('Last Name', validators=[DataRequired(), Length(min=2, max=50)])
-    password = PasswordField('Password', validators=[
-        DataRequired(),
-        Length(min=8, message='Password must be at least 8 characters long')
-    ])
+    username = StringField('Username', validators=[DataRequired(), USERNAME_LENGTH, USERNAME_REGEXP])
+    email = StringField('Email', validators=[DataRequired(), EMAIL])
+    first_name = StringField('First Name', validators=[DataRequired(), NAME_LENGTH])
+    last_name = StringField('Last Name', validators=[DataRequired(), NAME_LENGTH])
+    password = PasswordField('Password', validators=[DataRequired(), PASSWORD_LENGTH])
     password2 = PasswordField('Confirm Password', validators=[
         DataRequired(),
         EqualTo('password', message='Passwords must match')
@@ -228,14 +319,10 @@ class RegistrationForm(FlaskForm):
 
 class ProfileForm(FlaskForm):
     """User profile form"""
-    username = StringField('Username', validators=[
-        DataRequired(), 
-        Length(min=3, max=20),
-        Regexp('^[A-Za-z0-9_]+$', message='Username can only contain letters, numbers, and underscores')
-    ])
-    email = StringField('Email', validators=[DataRequired(), Email()])
-    first_name = StringField('First Name', validators=[DataRequired(), Length(min=2, max=50)])
-    last_name = StringField('Last Name', validators=[DataRequired(), Length(min=2, max=50)])
+    username = StringField('Username', validators=[DataRequired(), USERNAME_LENGTH, USERNAME_REGEXP])
+    email = StringField('Email', validators=[DataRequired(), EMAIL])
+    first_name = StringField('First Name', validators=[DataRequired(), NAME_LENGTH])
+    last_name = StringField('Last Name', validators=[DataRequired(), NAME_LENGTH])
     bio = TextAreaField('Bio', validators=[Length(max=500)])
     avatar_url = StringField('Avatar URL', validators=[Length(max=200)])
     submit = SubmitField('Update Profile')
@@ -257,10 +344,7 @@ class ProfileForm(FlaskForm):
 class ChangePasswordForm(FlaskForm):
     """Change password form"""
     current_password = PasswordField('Current Password', validators=[DataRequired()])
-    new_password = PasswordField('New Password', validators=[
-        DataRequired(),
-        Length(min=8, message='Password must be at least 8 characters long')
-    ])
+    new_password = PasswordField('New Password', validators=[DataRequired(), PASSWORD_LENGTH])
     new_password2 = PasswordField('Confirm New Password', validators=[
         DataRequired(),
         EqualTo('new_password', message='Passwords must match')
@@ -274,15 +358,12 @@ class ChangePasswordForm(FlaskForm):
 
 class PasswordResetRequestForm(FlaskForm):
     """Password reset request form"""
-    email = StringField('Email', validators=[DataRequired(), Email()])
+    email = StringField('Email', validators=[DataRequired(), EMAIL])
     submit = SubmitField('Request Password Reset')
 
 class PasswordResetForm(FlaskForm):
     """Password reset form"""
-    password = PasswordField('New Password', validators=[
-        DataRequired(),
-        Length(min=8, message='Password must be at least 8 characters long')
-    ])
+    password = PasswordField('New Password', validators=[DataRequired(), PASSWORD_LENGTH])
     password2 = PasswordField('Confirm New Password', validators=[
         DataRequired(),
         EqualTo('password', message='Passwords must match')
@@ -312,17 +393,88 @@ def role_required(role_name):
         return decorated_function
     return decorator
 
-# Routes
-@app.route('/')
-def index():
-    """Home page"""
-    stats = {
+# Helper functions
+def lookup_user(identifier):
+    """Find a user by username or email, one unique-index lookup at a time"""
+    if '@' in identifier:
+        return User.query.filter_by(email=identifier).first() or \
+               User.query.filter_by(username=identifier).first()
+    return User.query.filter_by(username=identifier).first() or \
+           User.query.filter_by(email=identifier).first()
+
+def list_load_options(*options):
+    """Loader options for list views; in debug mode any other lazy load raises"""
+    if app.debug:
+        return (*options, raiseload('*'))
+    return options
+
+# Keyset pagination
+# Lists are ordered newest first. ?after=<created_at>&after_id=<id> seeks past the
+# last row of the previous page instead of using OFFSET, so deep pages cost the
+# same as the first one. ?page=N still works through the old offset pagination.
+class KeysetPage:
+    """One page of keyset-paginated rows"""
+    def __init__(self, items, next_args):
+        self.items = items
+        self.next_args = next_args  # url_for() arguments for the next page
+        self.has_next = next_args is not None
+
+def paginate_newest_first(query, model, per_page):
+    """Paginate query by (created_at, id) descending using the request's args"""
+    order = (model.created_at.desc(), model.id.desc())
+    if 'page' in request.args and 'after' not in request.args:
+        page = request.args.get('page', 1, type=int)
+        return query.order_by(*order).paginate(page=page, per_page=per_page, error_out=False)
+    
+    after_id = request.args.get('after_id', type=int)
+    try:
+        after = datetime.fromisoformat(request.args.get('after', ''))
+    except ValueError:
+        after = None
+    if after and after_id:
+        query = query.filter(tuple_(model.created_at, model.id) < (after, after_id))
+    items = query.order_by(*order).limit(per_page + 1).all()
+    
+    next_args = None
+    if len(items) > per_page:
+        last = items[per_page - 1]
+        next_args = {'after': last.created_at.isoformat(), 'after_id': last.id}
+    return KeysetPage(items[:per_page], next_args)
+
+@cache.memoize(timeout=30)
+def get_home_stats():
+    """User, post and comment totals for the home page"""
+    return {
         'total_users': User.query.count(),
         'total_posts': Post.query.count(),
         'total_comments': Comment.query.count()
     }
+
+@cache.memoize(timeout=10)
+def get_admin_stats():
+    """Admin dashboard counts"""
+    # Conditional counts: one pass over users, one statement for posts and comments
+    user_stats = db.session.execute(select(
+        func.count(User.id).label('total_users'),
+        func.count(case((User.is_active == True, 1))).label('active_users'),
+        func.count(case((User.is_admin == True, 1))).label('admin_users')
+    )).one()
+    content_stats = db.session.execute(select(
+        select(func.count(Post.id)).scalar_subquery().label('total_posts'),
+        select(func.count(case((Post.is_published == True, 1)))).scalar_subquery().label('published_posts'),
+        select(func.count(Comment.id)).scalar_subquery().label('total_comments'),
+        select(func.count(case((Comment.is_approved == True, 1)))).scalar_subquery().label('approved_comments')
+    )).one()
+    return {**user_stats._mapping, **content_stats._mapping}
+
+# Routes
+@app.route('/')
+def index():
+    """Home page"""
+    stats = get_home_stats()
     
-    recent_posts = Post.query.filter_by(is_published=True)\
+    recent_posts = Post.query.options(selectinload(Post.author))\
+                           .filter_by(is_published=True)\
                            .order_by(Post.created_at.desc())\
                            .limit(5).all()
     
@@ -340,10 +492,7 @@ def login():
     form = LoginForm()
     if form.validate_on_submit():
         # Try to find user by username or email
-        user = User.query.filter(
-            (User.username == form.username.data) | 
-            (User.email == form.username.data)
-        ).first()
+        user = lookup_user(form.username.data)
         
         if user and user.check_password(form.password.data):
             if not user.is_active:
@@ -352,6 +501,7 @@ def login():
             
             login_user(user, remember=form.remember_me.data)
             user.update_login_info()
+            db.session.commit()
             
             next_page = request.args.get('next')
             if not next_page or not next_page.startswith('/'):
@@ -391,6 +541,8 @@ def register():
         
         db.session.add(user)
         db.session.commit()
+        cache.delete_memoized(get_home_stats)
+        cache.delete_memoized(get_admin_stats)
         
         flash('Registration successful! You can now log in.', 'success')
         return redirect(url_for('login'))
@@ -427,7 +579,6 @@ def edit_profile():
         current_user.last_name = form.last_name.data
         current_user.bio = form.bio.data
         current_user.avatar_url = form.avatar_url.data
-        current_user.updated_at = datetime.utcnow()
         
         db.session.commit()
         flash('Profile updated successfully!', 'success')
@@ -443,7 +594,6 @@ def change_password():
     
     if form.validate_on_submit():
         current_user.set_password(form.new_password.data)
-        current_user.updated_at = datetime.utcnow()
         
         db.session.commit()
         flash('Password changed successfully!', 'success')
@@ -465,14 +615,12 @@ def forgot_password():
             token = secrets.token_urlsafe(32)
             expires_at = datetime.utcnow() + timedelta(hours=1)
             
-            # Create password reset record
-            password_reset = PasswordReset(
+            # Create password reset record (plain INSERT, nothing reads the object back)
+            db.session.execute(insert(PasswordReset).values(
                 user_id=user.id,
-                token=token,
+                token_hash=PasswordReset.hash_token(token),
                 expires_at=expires_at
-            )
-            
-            db.session.add(password_reset)
+            ))
             db.session.commit()
             
             # In a real application, send email here
@@ -491,9 +639,16 @@ def reset_password(token):
     if current_user.is_authenticated:
         return redirect(url_for('index'))
     
-    password_reset = PasswordReset.query.filter_by(token=token).first()
+    # Only the token's hash is stored, so a leaked table holds no usable tokens;
+    # used and expired tokens are filtered out by the same indexed lookup
+    token_hash = PasswordReset.hash_token(token)
+    password_reset = PasswordReset.query.filter(
+        PasswordReset.token_hash == token_hash,
+        PasswordReset.used == False,
+        PasswordReset.expires_at > datetime.utcnow()
+    ).first()
     
-    if not password_reset or not password_reset.is_valid():
+    if not password_reset:
         flash('Invalid or expired password reset token.', 'error')
         return redirect(url_for('forgot_password'))
     
@@ -501,7 +656,6 @@ def reset_password(token):
     if form.validate_on_submit():
         user = password_reset.user
         user.set_password(form.password.data)
-        user.updated_at = datetime.utcnow()
         
         password_reset.used = True
         
@@ -516,8 +670,8 @@ def reset_password(token):
 @login_required
 def users_list():
     """List all users (admin only)"""
-    page = request.args.get('page', 1, type=int)
-    users = User.query.paginate(page=page, per_page=10, error_out=False)
+    users = paginate_newest_first(
+        User.query.options(*list_load_options(load_only(*USER_SUMMARY_COLUMNS))), User, per_page=10)
     
     return render_template('users.html',
                          users=users,
@@ -530,7 +684,8 @@ def user_detail(user_id):
     user = User.query.get_or_404(user_id)
     
     # Get user's posts
-    posts = Post.query.filter_by(author_id=user_id)\
+    posts = Post.query.options(*list_load_options(selectinload(Post.author)))\
+                    .filter_by(author_id=user_id)\
                     .order_by(Post.created_at.desc())\
                     .limit(10).all()
     
@@ -543,18 +698,12 @@ def user_detail(user_id):
 @admin_required
 def admin_dashboard():
     """Admin dashboard"""
-    stats = {
-        'total_users': User.query.count(),
-        'active_users': User.query.filter_by(is_active=True).count(),
-        'admin_users': User.query.filter_by(is_admin=True).count(),
-        'total_posts': Post.query.count(),
-        'published_posts': Post.query.filter_by(is_published=True).count(),
-        'total_comments': Comment.query.count(),
-        'approved_comments': Comment.query.filter_by(is_approved=True).count()
-    }
+    stats = get_admin_stats()
     
-    recent_users = User.query.order_by(User.created_at.desc()).limit(5).all()
-    recent_posts = Post.query.order_by(Post.created_at.desc()).limit(5).all()
+    recent_users = User.query.options(load_only(*USER_SUMMARY_COLUMNS))\
+                           .order_by(User.created_at.desc()).limit(5).all()
+    recent_posts = Post.query.options(selectinload(Post.author))\
+                           .order_by(Post.created_at.desc()).limit(5).all()
     
     return render_template('admin/dashboard.html',
                          stats=stats,
@@ -566,20 +715,52 @@ def admin_dashboard():
 @admin_required
 def admin_users():
     """Admin user management"""
-    page = request.args.get('page', 1, type=int)
-    users = User.query.paginate(page=page, per_page=20, error_out=False)
+    users = paginate_newest_first(
+        User.query.options(load_only(*USER_SUMMARY_COLUMNS)), User, per_page=20)
     
     return render_template('admin/users.html',
                          users=users,
                          title='User Management')
 
+# Columns written by the user CSV export, in order
+USER_EXPORT_COLUMNS = (User.id, User.username, User.email, User.first_name, User.last_name,
+                       User.is_active, User.is_admin, User.created_at, User.last_login, User.login_count)
+
+@app.route('/admin/users.csv')
+@admin_required
+def admin_users_csv():
+    """Export all users as CSV"""
+    def generate():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow([column.key for column in USER_EXPORT_COLUMNS])
+        # Plain rows fetched in batches, so memory stays flat however many users there are
+        rows = db.session.execute(select(*USER_EXPORT_COLUMNS).order_by(User.id)
+                                  .execution_options(yield_per=500))
+        for row in rows:
+            writer.writerow(row)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+        yield buffer.getvalue()
+    
+    return Response(stream_with_context(generate()), mimetype='text/csv',
+                    headers={'Content-Disposition': 'attachment; filename=users.csv'})
+
 @app.route('/admin/user/<int:user_id>/toggle-status')
 @admin_required
 def toggle_user_status(user_id):
     """Toggle user active status"""
-    user = User.query.get_or_404(user_id)
-    user.is_active = not user.is_active
+    # Flip the flag in SQL and read back what the flash message needs, in one statement
+    user = db.session.execute(
+        update(User).where(User.id == user_id)
+                    .values(is_active=not_(User.is_active))
+                    .returning(User.username, User.is_active)
+    ).one_or_none()
+    if user is None:
+        abort(404)
     db.session.commit()
+    cache.delete_memoized(get_admin_stats)
     
     status = 'activated' if user.is_active else 'deactivated'
     flash(f'User {user.username} has been {status}.', 'success')
@@ -590,10 +771,9 @@ def toggle_user_status(user_id):
 @login_required
 def posts_list():
     """List posts"""
-    page = request.args.get('page', 1, type=int)
-    posts = Post.query.filter_by(is_published=True)\
-                    .order_by(Post.created_at.desc())\
-                    .paginate(page=page, per_page=10, error_out=False)
+    posts = paginate_newest_first(
+        Post.query.options(*list_load_options(selectinload(Post.author))).filter_by(is_published=True),
+        Post, per_page=10)
     
     return render_template('posts.html',
                          posts=posts,
@@ -603,10 +783,11 @@ def posts_list():
 @login_required
 def post_detail(post_id):
     """Post detail page"""
-    post = Post.query.get_or_404(post_id)
+    post = Post.query.options(selectinload(Post.author)).get_or_404(post_id)
     
     # Get comments
-    comments = Comment.query.filter_by(post_id=post_id, is_approved=True)\
+    comments = Comment.query.options(*list_load_options(selectinload(Comment.author)))\
+                          .filter_by(post_id=post_id, is_approved=True)\
                           .order_by(Comment.created_at.asc()).all()
     
     return render_template('post_detail.html',
@@ -639,6 +820,32 @@ def api_session_info():
         'permanent': session.permanent
     })
 
+# Query counting
+# In debug mode every request counts the SQL statements it runs and logs a
+# warning past the threshold, which is usually a lazy load inside a loop.
+QUERY_COUNT_WARNING = 10
+
+def count_query(conn, cursor, statement, parameters, context, executemany):
+    """Count a statement against the current request, if it is being counted"""
+    if has_app_context() and 'query_count' in g:
+        g.query_count += 1
+
+with app.app_context():
+    event.listen(db.engine, 'before_cursor_execute', count_query)
+
+@app.before_request
+def start_query_count():
+    """Start counting queries for this request (debug only)"""
+    if app.debug:
+        g.query_count = 0
+
+@app.after_request
+def check_query_count(response):
+    """Warn when a request ran more queries than expected"""
+    if app.debug and g.get('query_count', 0) > QUERY_COUNT_WARNING:
+        app.logger.warning('Possible N+1: %d queries on %s', g.query_count, request.path)
+    return response
+
 # Error handlers
 @app.errorhandler(404)
 def not_found(error):
@@ -660,6 +867,15 @@ def inject_global_vars():
         'current_year': datetime.now().year
     }
 
+# CLI commands
+@app.cli.command('gc-resets')
+def gc_resets():
+    """Delete password reset tokens that expired more than a week ago"""
+    cutoff = datetime.utcnow() - timedelta(days=7)
+    result = db.session.execute(delete(PasswordReset).where(PasswordReset.expires_at < cutoff))
+    db.session.commit()
+    print(f"Deleted {result.rowcount} expired password reset tokens.")
+
 if __name__ == '__main__':
     # Create necessary directories
     os.makedirs('instance', exist_ok=True)
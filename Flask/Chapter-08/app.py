@@ -22,35 +22,73 @@ Let's build a well-structured Flask application using blueprints.
 
 import os
 from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
+from flask.json.provider import DefaultJSONProvider
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_login import LoginManager
+from flask_caching import Cache
+from flask_compress import Compress
 from flask_wtf.csrf import CSRFProtect
+from sqlalchemy import event
+from sqlalchemy.pool import NullPool
 from datetime import datetime
 import logging
 from logging.handlers import RotatingFileHandler
+import orjson
 
 # Initialize extensions
 db = SQLAlchemy()
 migrate = Migrate()
 login_manager = LoginManager()
 csrf = CSRFProtect()
+cache = Cache()
+compress = Compress()
+
+# Cached counts that every user, post, comment or category change makes stale
+STATS_CACHE_KEYS = ('home_stats', 'admin_stats', 'admin_statistics', 'api_stats')
+
+def invalidate_stats():
+    """Drop the cached counts one key at a time (delete_many stops at the first uncached key)"""
+    for key in STATS_CACHE_KEYS:
+        cache.delete(key)
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson, which serializes datetimes (as ISO 8601) in C"""
+    def dumps(self, obj, **kwargs):
+        option = orjson.OPT_SORT_KEYS if self.sort_keys else 0
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+    
+    def loads(self, s, **kwargs):
+        # The session serializer passes object_hook to untag values; orjson can't take it
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
 
 def create_app(config_name=None):
     """Application factory function"""
     app = Flask(__name__)
+    app.json = OrjsonProvider(app)
     
     # Load configuration
     if config_name is None:
         config_name = os.environ.get('FLASK_ENV', 'development')
     
     app.config.from_object(f'app.config.{config_name.title()}Config')
+    configure_engine_options(app)
     
     # Initialize extensions with app
     db.init_app(app)
     migrate.init_app(app, db)
     login_manager.init_app(app)
     csrf.init_app(app)
+    cache.init_app(app)
+    compress.init_app(app)
+    
+    with app.app_context():
+        if db.engine.dialect.name == 'sqlite':
+            event.listen(db.engine, 'connect', set_sqlite_pragmas)
     
     # Configure login manager
     login_manager.login_view = 'auth.login'
@@ -83,13 +121,46 @@ def create_app(config_name=None):
     # Logging configuration
     configure_logging(app)
     
-    # Create database tables
-    with app.app_context():
-        db.create_all()
-        create_sample_data()
+    # CLI commands
+    register_commands(app)
     
     return app
 
+def configure_engine_options(app):
+    """Build SQLALCHEMY_ENGINE_OPTIONS from the pool settings unless the config sets it"""
+    if 'SQLALCHEMY_ENGINE_OPTIONS' in app.config:
+        return
+    if app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+        # SQLite connections are cheap to open and writes are serialised anyway
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+            'poolclass': NullPool,
+            'connect_args': {'check_same_thread': False},
+        }
+    else:
+        options = {
+            'pool_size': app.config['DB_POOL_SIZE'],
+            'max_overflow': app.config['DB_MAX_OVERFLOW'],
+            'pool_pre_ping': True,
+            'pool_recycle': app.config['DB_POOL_RECYCLE'],
+            'pool_timeout': app.config['DB_POOL_TIMEOUT'],
+            'insertmanyvalues_page_size': app.config['DB_INSERT_PAGE_SIZE'],
+        }
+        uri = app.config['SQLALCHEMY_DATABASE_URI']
+        if uri.startswith(('postgresql://', 'postgresql+psycopg2://')):
+            # Batch executemany() calls into multi-row statements on psycopg2
+            options['executemany_mode'] = 'values_plus_batch'
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """WAL journal with relaxed syncing, enforced foreign keys and memory-backed temp storage"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.execute('PRAGMA foreign_keys=ON')
+    cursor.execute('PRAGMA temp_store=MEMORY')
+    cursor.execute('PRAGMA mmap_size=268435456')
+    cursor.close()
+
 def register_error_handlers(app):
     """Register error handlers"""
     @app.errorhandler(404)
@@ -115,6 +186,15 @@ def register_context_processors(app):
             'app_version': '1.0.0'
         }
 
+def register_commands(app):
+    """Register CLI commands"""
+    @app.cli.command('init-db')
+    def init_db():
+        """Create database tables and the default admin user"""
+        db.create_all()
+        create_sample_data()
+        print('Database initialized.')
+
 def configure_logging(app):
     """Configure application logging"""
     if not app.debug and not app.testing:
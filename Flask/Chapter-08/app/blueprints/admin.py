@@ -1,12 +1,14 @@
 """
 Admin blueprint for administrative functions
 """
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, abort
 from flask_login import login_required, current_user
 from functools import wraps
 from app.models import User, Post, Category, Comment
-from app import db
-from sqlalchemy import desc, func
+from app import db, cache, invalidate_stats
+from datetime import datetime
+from sqlalchemy import desc, func, case, select, literal, union_all, update, not_, and_, lambda_stmt
+from sqlalchemy.orm import joinedload
 
 admin_bp = Blueprint('admin', __name__)
 
@@ -20,30 +22,74 @@ def admin_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+# Dashboard counts: one pass over users, one statement for everything else.
+# lambda_stmt caches their construction and compiled SQL across requests.
+DASHBOARD_USER_STATS = lambda_stmt(lambda: select(
+    func.count(User.id).label('total_users'),
+    func.count(case((User.is_active == True, 1))).label('active_users'),
+    func.count(case((User.is_admin == True, 1))).label('admin_users')
+))
+DASHBOARD_CONTENT_STATS = lambda_stmt(lambda: select(
+    select(func.count(Post.id)).scalar_subquery().label('total_posts'),
+    select(func.count(case((Post.is_published == True, 1)))).scalar_subquery().label('published_posts'),
+    select(func.count(Comment.id)).scalar_subquery().label('total_comments'),
+    select(func.count(case((Comment.is_approved == True, 1)))).scalar_subquery().label('approved_comments'),
+    select(func.count(Category.id)).scalar_subquery().label('total_categories')
+))
+
+@cache.cached(timeout=60, key_prefix='admin_stats')
+def get_dashboard_stats():
+    """Dashboard counts, refreshed at most once a minute (the numbers are the same for every admin)"""
+    user_stats = db.session.execute(DASHBOARD_USER_STATS).one()
+    content_stats = db.session.execute(DASHBOARD_CONTENT_STATS).one()
+    return {**user_stats._mapping, **content_stats._mapping}
+
+def recent_rows(kind, model, label_column):
+    """The five newest rows of model as (kind, id, label, created_at), ready for a UNION"""
+    newest = select(literal(kind).label('kind'), model.id, label_column.label('label'), model.created_at)\
+        .order_by(desc(model.created_at)).limit(5).subquery()
+    return select(newest)
+
+def update_unlocked(model, ident, values, *returning):
+    """UPDATE one row unless another transaction holds its lock, returning the RETURNING row
+
+    The row is picked with FOR UPDATE SKIP LOCKED, so a concurrent toggle makes this
+    return None at once instead of waiting. A missing row aborts with 404.
+    """
+    unlocked_id = select(model.id).where(model.id == ident)\
+        .with_for_update(skip_locked=True).scalar_subquery()
+    row = db.session.execute(
+        update(model).where(model.id == unlocked_id).values(**values).returning(*returning)
+    ).one_or_none()
+    if row is None and db.session.get(model, ident) is None:
+        abort(404)
+    return row
+
 @admin_bp.route('/')
 @admin_required
 def dashboard():
     """Admin dashboard"""
-    stats = {
-        'total_users': User.query.count(),
-        'active_users': User.query.filter_by(is_active=True).count(),
-        'admin_users': User.query.filter_by(is_admin=True).count(),
-        'total_posts': Post.query.count(),
-        'published_posts': Post.query.filter_by(is_published=True).count(),
-        'total_comments': Comment.query.count(),
-        'approved_comments': Comment.query.filter_by(is_approved=True).count(),
-        'total_categories': Category.query.count()
-    }
-    
-    recent_users = User.query.order_by(desc(User.created_at)).limit(5).all()
-    recent_posts = Post.query.order_by(desc(Post.created_at)).limit(5).all()
-    recent_comments = Comment.query.order_by(desc(Comment.created_at)).limit(5).all()
+    stats = get_dashboard_stats()
+    
+    # Newest users, posts and comments in one round-trip.
+    # Template contract: recent_users, recent_posts and recent_comments are lists of up
+    # to five rows, newest first, with .kind, .id, .label and .created_at - not model
+    # instances. label is the username, the post title or the first 100 characters of
+    # the comment; anything else (author, email, url_for by object) needs row.id
+    recent = {'user': [], 'post': [], 'comment': []}
+    rows = db.session.execute(union_all(
+        recent_rows('user', User, User.username),
+        recent_rows('post', Post, Post.title),
+        recent_rows('comment', Comment, func.substr(Comment.content, 1, 100))
+    ).order_by(desc('created_at')))
+    for row in rows:
+        recent[row.kind].append(row)
     
     return render_template('admin/dashboard.html',
                          stats=stats,
-                         recent_users=recent_users,
-                         recent_posts=recent_posts,
-                         recent_comments=recent_comments,
+                         recent_users=recent['user'],
+                         recent_posts=recent['post'],
+                         recent_comments=recent['comment'],
                          title='Admin Dashboard')
 
 @admin_bp.route('/users')
@@ -57,30 +103,39 @@ def users():
                          users=users,
                          title='User Management')
 
-@admin_bp.route('/user/<int:user_id>/toggle-status')
+@admin_bp.route('/user/<int:user_id>/toggle-status', methods=['POST'])
 @admin_required
 def toggle_user_status(user_id):
     """Toggle user active status"""
-    user = User.query.get_or_404(user_id)
-    user.is_active = not user.is_active
+    # Flip the flag in SQL and read back what the flash message needs, in one statement
+    user = update_unlocked(User, user_id, {'is_active': not_(User.is_active)},
+                           User.username, User.is_active)
+    if user is None:
+        flash('That user is being updated by someone else. Please try again.', 'warning')
+        return redirect(url_for('admin.users'))
     db.session.commit()
+    invalidate_stats()
     
     status = 'activated' if user.is_active else 'deactivated'
     flash(f'User {user.username} has been {status}.', 'success')
     
     return redirect(url_for('admin.users'))
 
-@admin_bp.route('/user/<int:user_id>/toggle-admin')
+@admin_bp.route('/user/<int:user_id>/toggle-admin', methods=['POST'])
 @admin_required
 def toggle_user_admin(user_id):
     """Toggle user admin status"""
-    user = User.query.get_or_404(user_id)
-    if user.id == current_user.id:
+    if user_id == current_user.id:
         flash('You cannot change your own admin status.', 'error')
         return redirect(url_for('admin.users'))
     
-    user.is_admin = not user.is_admin
+    user = update_unlocked(User, user_id, {'is_admin': not_(User.is_admin)},
+                           User.username, User.is_admin)
+    if user is None:
+        flash('That user is being updated by someone else. Please try again.', 'warning')
+        return redirect(url_for('admin.users'))
     db.session.commit()
+    invalidate_stats()
     
     status = 'granted admin privileges' if user.is_admin else 'removed admin privileges'
     flash(f'User {user.username} has been {status}.', 'success')
@@ -92,22 +147,29 @@ def toggle_user_admin(user_id):
 def posts():
     """Admin post management"""
     page = request.args.get('page', 1, type=int)
-    posts = Post.query.order_by(desc(Post.created_at))\
+    posts = Post.query.options(joinedload(Post.author), joinedload(Post.category))\
+                    .order_by(desc(Post.created_at))\
                     .paginate(page=page, per_page=20, error_out=False)
     
     return render_template('admin/posts.html',
                          posts=posts,
                          title='Post Management')
 
-@admin_bp.route('/post/<int:post_id>/toggle-published')
+@admin_bp.route('/post/<int:post_id>/toggle-published', methods=['POST'])
 @admin_required
 def toggle_post_published(post_id):
     """Toggle post published status"""
-    post = Post.query.get_or_404(post_id)
-    post.is_published = not post.is_published
-    if post.is_published and not post.published_at:
-        post.published_at = datetime.utcnow()
+    # SET expressions see the old row, so is_published == False means "being published now"
+    post = update_unlocked(Post, post_id, {
+        'is_published': not_(Post.is_published),
+        'published_at': case((and_(Post.is_published == False, Post.published_at.is_(None)), datetime.utcnow()),
+                             else_=Post.published_at)
+    }, Post.title, Post.is_published)
+    if post is None:
+        flash('That post is being updated by someone else. Please try again.', 'warning')
+        return redirect(url_for('admin.posts'))
     db.session.commit()
+    invalidate_stats()
     
     status = 'published' if post.is_published else 'unpublished'
     flash(f'Post "{post.title}" has been {status}.', 'success')
@@ -126,13 +188,17 @@ def comments():
                          comments=comments,
                          title='Comment Management')
 
-@admin_bp.route('/comment/<int:comment_id>/toggle-approved')
+@admin_bp.route('/comment/<int:comment_id>/toggle-approved', methods=['POST'])
 @admin_required
 def toggle_comment_approved(comment_id):
     """Toggle comment approved status"""
-    comment = Comment.query.get_or_404(comment_id)
-    comment.is_approved = not comment.is_approved
+    comment = update_unlocked(Comment, comment_id, {'is_approved': not_(Comment.is_approved)},
+                              Comment.is_approved)
+    if comment is None:
+        flash('That comment is being updated by someone else. Please try again.', 'warning')
+        return redirect(url_for('admin.comments'))
     db.session.commit()
+    invalidate_stats()
     
     status = 'approved' if comment.is_approved else 'unapproved'
     flash(f'Comment has been {status}.', 'success')
@@ -149,49 +215,63 @@ def categories():
                          categories=categories,
                          title='Category Management')
 
-@admin_bp.route('/category/<int:category_id>/toggle-active')
+@admin_bp.route('/category/<int:category_id>/toggle-active', methods=['POST'])
 @admin_required
 def toggle_category_active(category_id):
     """Toggle category active status"""
-    category = Category.query.get_or_404(category_id)
-    category.is_active = not category.is_active
+    category = update_unlocked(Category, category_id, {'is_active': not_(Category.is_active)},
+                               Category.name, Category.is_active)
+    if category is None:
+        flash('That category is being updated by someone else. Please try again.', 'warning')
+        return redirect(url_for('admin.categories'))
     db.session.commit()
+    invalidate_stats()
     
     status = 'activated' if category.is_active else 'deactivated'
     flash(f'Category "{category.name}" has been {status}.', 'success')
     
     return redirect(url_for('admin.categories'))
 
-@admin_bp.route('/statistics')
-@admin_required
-def statistics():
-    """Admin statistics page"""
+@cache.cached(timeout=60, key_prefix='admin_statistics')
+def get_statistics():
+    """User, post and comment breakdowns for the statistics page, refreshed at most once a minute"""
+    month_start = datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    
+    # One aggregate SELECT (a single table scan) per entity
     # User statistics
-    user_stats = {
-        'total': User.query.count(),
-        'active': User.query.filter_by(is_active=True).count(),
-        'admins': User.query.filter_by(is_admin=True).count(),
-        'verified': User.query.filter_by(is_verified=True).count(),
-        'new_this_month': User.query.filter(User.created_at >= datetime.utcnow().replace(day=1)).count()
-    }
+    user_stats = dict(db.session.execute(select(
+        func.count(User.id).label('total'),
+        func.count(case((User.is_active == True, 1))).label('active'),
+        func.count(case((User.is_admin == True, 1))).label('admins'),
+        func.count(case((User.is_verified == True, 1))).label('verified'),
+        func.count(case((User.created_at >= month_start, 1))).label('new_this_month')
+    )).one()._mapping)
     
     # Post statistics
-    post_stats = {
-        'total': Post.query.count(),
-        'published': Post.query.filter_by(is_published=True).count(),
-        'drafts': Post.query.filter_by(is_published=False).count(),
-        'featured': Post.query.filter_by(is_featured=True).count(),
-        'new_this_month': Post.query.filter(Post.created_at >= datetime.utcnow().replace(day=1)).count()
-    }
+    post_stats = dict(db.session.execute(select(
+        func.count(Post.id).label('total'),
+        func.count(case((Post.is_published == True, 1))).label('published'),
+        func.count(case((Post.is_published == False, 1))).label('drafts'),
+        func.count(case((Post.is_featured == True, 1))).label('featured'),
+        func.count(case((Post.created_at >= month_start, 1))).label('new_this_month')
+    )).one()._mapping)
     
     # Comment statistics
-    comment_stats = {
-        'total': Comment.query.count(),
-        'approved': Comment.query.filter_by(is_approved=True).count(),
-        'pending': Comment.query.filter_by(is_approved=False).count(),
-        'spam': Comment.query.filter_by(is_spam=True).count(),
-        'new_this_month': Comment.query.filter(Comment.created_at >= datetime.utcnow().replace(day=1)).count()
-    }
+    comment_stats = dict(db.session.execute(select(
+        func.count(Comment.id).label('total'),
+        func.count(case((Comment.is_approved == True, 1))).label('approved'),
+        func.count(case((Comment.is_approved == False, 1))).label('pending'),
+        func.count(case((Comment.is_spam == True, 1))).label('spam'),
+        func.count(case((Comment.created_at >= month_start, 1))).label('new_this_month')
+    )).one()._mapping)
+    
+    return user_stats, post_stats, comment_stats
+
+@admin_bp.route('/statistics')
+@admin_required
+def statistics():
+    """Admin statistics page"""
+    user_stats, post_stats, comment_stats = get_statistics()
     
     return render_template('admin/statistics.html',
                          user_stats=user_stats,
@@ -1,13 +1,16 @@
 """
 API blueprint for REST API endpoints
 """
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context
 from flask_login import login_required, current_user
 from functools import wraps
 from app.models import User, Post, Category, Comment
-from app import db
-from sqlalchemy import desc
+from app import db, cache
+from sqlalchemy import desc, func, case, select, lambda_stmt
+from sqlalchemy.orm import selectinload
 import json
+import math
+import hashlib
 
 api_bp = Blueprint('api', __name__)
 
@@ -20,6 +23,37 @@ def admin_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+def request_etag(*versions):
+    """ETag for this URL (query string included) at the given data versions"""
+    return hashlib.sha1(repr((request.full_path, *versions)).encode()).hexdigest()
+
+def not_modified(etag):
+    """A 304 response if the client already holds etag, otherwise None"""
+    # Flask-Compress sends compressed bodies with the ETag suffixed ':br' or ':gzip';
+    # the data version is the part before it
+    held = {tag.split(':', 1)[0] for tag in request.if_none_match.as_set(include_weak=True)}
+    if etag in held or request.if_none_match.star_tag:
+        response = Response(status=304)
+        response.set_etag(etag, weak=True)
+        return response
+    return None
+
+class WindowPage:
+    """A page of rows whose total comes from COUNT(*) OVER () in the same query"""
+    def __init__(self, query, page, per_page):
+        self.page, self.per_page = max(page, 1), max(per_page, 1)
+        rows = query.add_columns(func.count().over().label('window_total'))\
+                    .limit(self.per_page).offset((self.page - 1) * self.per_page).all()
+        if rows:
+            self.total = rows[0].window_total
+        else:
+            # Past the last page the window has no rows to report on
+            self.total = query.order_by(None).count() if self.page > 1 else 0
+        self.items = rows
+        self.pages = math.ceil(self.total / self.per_page)
+        self.has_next = self.page < self.pages
+        self.has_prev = self.page > 1
+
 @api_bp.route('/users')
 @login_required
 def get_users():
@@ -27,18 +61,23 @@ def get_users():
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 20, type=int)
     
-    users = User.query.paginate(page=page, per_page=per_page, error_out=False)
+    # Only the serialized columns, as plain rows rather than User objects
+    query = User.query.with_entities(User.id, User.username, User.email, User.first_name,
+                                     User.last_name, User.is_active, User.is_admin,
+                                     User.created_at, User.last_login)\
+                    .order_by(User.id)
+    users = WindowPage(query, page, per_page)
     
     return jsonify({
         'users': [{
             'id': user.id,
             'username': user.username,
             'email': user.email,
-            'full_name': user.full_name,
+            'full_name': f"{user.first_name} {user.last_name}",
             'is_active': user.is_active,
             'is_admin': user.is_admin,
-            'created_at': user.created_at.isoformat(),
-            'last_login': user.last_login.isoformat() if user.last_login else None
+            'created_at': user.created_at,
+            'last_login': user.last_login
         } for user in users.items],
         'pagination': {
             'page': users.page,
@@ -54,7 +93,7 @@ def get_users():
 @login_required
 def get_user(user_id):
     """Get specific user (API)"""
-    user = User.query.get_or_404(user_id)
+    user = db.get_or_404(User, user_id)
     
     return jsonify({
         'id': user.id,
@@ -67,12 +106,41 @@ def get_user(user_id):
         'is_active': user.is_active,
         'is_admin': user.is_admin,
         'is_verified': user.is_verified,
-        'created_at': user.created_at.isoformat(),
-        'updated_at': user.updated_at.isoformat(),
-        'last_login': user.last_login.isoformat() if user.last_login else None,
+        'created_at': user.created_at,
+        'updated_at': user.updated_at,
+        'last_login': user.last_login,
         'login_count': user.login_count
     })
 
+def serialize_post_row(post):
+    """JSON-ready dict for a row from the get_posts query"""
+    return {
+        'id': post.id,
+        'title': post.title,
+        'slug': post.slug,
+        'excerpt': post.excerpt,
+        'content': post.content,
+        'featured_image': post.featured_image,
+        'is_published': post.is_published,
+        'is_featured': post.is_featured,
+        'view_count': post.view_count,
+        'like_count': post.like_count,
+        'reading_time': Post.estimate_reading_time(post.content),
+        'created_at': post.created_at,
+        'updated_at': post.updated_at,
+        'published_at': post.published_at,
+        'author': {
+            'id': post.author_id,
+            'username': post.author_username,
+            'full_name': f"{post.author_first_name} {post.author_last_name}"
+        },
+        'category': {
+            'id': post.category_id,
+            'name': post.category_name,
+            'slug': post.category_slug
+        }
+    }
+
 @api_bp.route('/posts')
 @login_required
 def get_posts():
@@ -82,57 +150,68 @@ def get_posts():
     category_id = request.args.get('category', type=int)
     published_only = request.args.get('published_only', 'true').lower() == 'true'
     
-    query = Post.query
+    # Plain rows of the serialized columns, with author and category joined in
+    query = Post.query.with_entities(
+        Post.id, Post.title, Post.slug, Post.excerpt, Post.content, Post.featured_image,
+        Post.is_published, Post.is_featured, Post.view_count, Post.like_count,
+        Post.created_at, Post.updated_at, Post.published_at,
+        User.id.label('author_id'), User.username.label('author_username'),
+        User.first_name.label('author_first_name'), User.last_name.label('author_last_name'),
+        Category.id.label('category_id'), Category.name.label('category_name'),
+        Category.slug.label('category_slug')
+    ).join(User, Post.author_id == User.id).join(Category, Post.category_id == Category.id)
     if published_only:
-        query = query.filter_by(is_published=True)
+        query = query.filter(Post.is_published == True)
     if category_id:
-        query = query.filter_by(category_id=category_id)
+        query = query.filter(Post.category_id == category_id)
     
-    posts = query.order_by(desc(Post.created_at))\
-                .paginate(page=page, per_page=per_page, error_out=False)
+    page, per_page = max(page, 1), max(per_page, 1)
+    # The pagination count and the newest updated_at of every table the body draws on
+    # (posts, their authors and categories) double as the ETag version
+    total, *last_updated = query.with_entities(
+        func.count(Post.id), func.max(Post.updated_at),
+        func.max(User.updated_at), func.max(Category.updated_at)
+    ).one()
+    etag = request_etag(total, *last_updated)
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    pages = math.ceil(total / per_page)
+    rows = query.order_by(desc(Post.created_at))\
+                .limit(per_page).offset((page - 1) * per_page)\
+                .execution_options(stream_results=True).yield_per(100)
+    pagination = {
+        'page': page,
+        'pages': pages,
+        'per_page': per_page,
+        'total': total,
+        'has_next': page < pages,
+        'has_prev': page > 1
+    }
     
-    return jsonify({
-        'posts': [{
-            'id': post.id,
-            'title': post.title,
-            'slug': post.slug,
-            'excerpt': post.excerpt,
-            'content': post.content,
-            'featured_image': post.featured_image,
-            'is_published': post.is_published,
-            'is_featured': post.is_featured,
-            'view_count': post.view_count,
-            'like_count': post.like_count,
-            'reading_time': post.reading_time,
-            'created_at': post.created_at.isoformat(),
-            'updated_at': post.updated_at.isoformat(),
-            'published_at': post.published_at.isoformat() if post.published_at else None,
-            'author': {
-                'id': post.author.id,
-                'username': post.author.username,
-                'full_name': post.author.full_name
-            },
-            'category': {
-                'id': post.category.id,
-                'name': post.category.name,
-                'slug': post.category.slug
-            }
-        } for post in posts.items],
-        'pagination': {
-            'page': posts.page,
-            'pages': posts.pages,
-            'per_page': posts.per_page,
-            'total': posts.total,
-            'has_next': posts.has_next,
-            'has_prev': posts.has_prev
-        }
-    })
+    # Stream the page one post at a time instead of building the whole list first
+    def generate():
+        yield '{"posts":['
+        for index, post in enumerate(rows):
+            yield (',' if index else '') + current_app.json.dumps(serialize_post_row(post))
+        yield '],"pagination":' + current_app.json.dumps(pagination) + '}'
+    
+    response = Response(stream_with_context(generate()), mimetype='application/json')
+    response.set_etag(etag, weak=True)
+    return response
 
 @api_bp.route('/posts/<int:post_id>')
 @login_required
 def get_post(post_id):
     """Get specific post (API)"""
-    post = Post.query.get_or_404(post_id)
+    post = db.get_or_404(Post, post_id)
+    
+    # One query for a page of approved comments and one IN query for all their authors
+    comments_page = request.args.get('comments_page', 1, type=int)
+    comments = Comment.query.filter_by(post_id=post_id, is_approved=True)\
+                          .options(selectinload(Comment.author))\
+                          .order_by(Comment.created_at)\
+                          .paginate(page=comments_page, per_page=50, error_out=False)
     
     return jsonify({
         'id': post.id,
@@ -146,9 +225,9 @@ def get_post(post_id):
         'view_count': post.view_count,
         'like_count': post.like_count,
         'reading_time': post.reading_time,
-        'created_at': post.created_at.isoformat(),
-        'updated_at': post.updated_at.isoformat(),
-        'published_at': post.published_at.isoformat() if post.published_at else None,
+        'created_at': post.created_at,
+        'updated_at': post.updated_at,
+        'published_at': post.published_at,
         'author': {
             'id': post.author.id,
             'username': post.author.username,
@@ -165,31 +244,57 @@ def get_post(post_id):
             'id': comment.id,
             'content': comment.content,
             'is_approved': comment.is_approved,
-            'created_at': comment.created_at.isoformat(),
+            'created_at': comment.created_at,
             'author': {
                 'id': comment.author.id,
                 'username': comment.author.username,
                 'full_name': comment.author.full_name
             }
-        } for comment in post.comments.filter_by(is_approved=True).all()]
+        } for comment in comments.items],
+        'comments_pagination': {
+            'page': comments.page,
+            'pages': comments.pages,
+            'per_page': comments.per_page,
+            'total': comments.total,
+            'has_next': comments.has_next,
+            'has_prev': comments.has_prev
+        }
     })
 
 @api_bp.route('/categories')
 def get_categories():
     """Get all categories (API)"""
-    categories = Category.query.filter_by(is_active=True).all()
+    version = db.session.execute(select(
+        select(func.count(Category.id)).scalar_subquery(),
+        select(func.max(Category.updated_at)).scalar_subquery(),
+        select(func.count(Post.id)).scalar_subquery(),
+        # post_count moves with any post edit, including a change of category
+        select(func.max(Post.updated_at)).scalar_subquery()
+    )).one()
+    etag = request_etag(*version)
+    cached = not_modified(etag)
+    if cached:
+        return cached
     
-    return jsonify({
+    # Post counts come from the same grouped query instead of one COUNT per category
+    categories = db.session.query(Category, func.count(Post.id).label('post_count'))\
+                          .outerjoin(Post, Post.category_id == Category.id)\
+                          .filter(Category.is_active == True)\
+                          .group_by(Category.id).all()
+    
+    response = jsonify({
         'categories': [{
             'id': category.id,
             'name': category.name,
             'slug': category.slug,
             'description': category.description,
             'color': category.color,
-            'post_count': category.posts.count(),
-            'created_at': category.created_at.isoformat()
-        } for category in categories]
+            'post_count': post_count,
+            'created_at': category.created_at
+        } for category, post_count in categories]
     })
+    response.set_etag(etag, weak=True)
+    return response
 
 @api_bp.route('/comments')
 @login_required
@@ -200,14 +305,20 @@ def get_comments():
     post_id = request.args.get('post_id', type=int)
     approved_only = request.args.get('approved_only', 'true').lower() == 'true'
     
-    query = Comment.query
+    # Plain rows of the serialized columns, with author and post joined in
+    query = Comment.query.with_entities(
+        Comment.id, Comment.content, Comment.is_approved, Comment.is_spam,
+        Comment.created_at, Comment.updated_at,
+        User.id.label('author_id'), User.username.label('author_username'),
+        User.first_name.label('author_first_name'), User.last_name.label('author_last_name'),
+        Post.id.label('post_id'), Post.title.label('post_title'), Post.slug.label('post_slug')
+    ).join(User, Comment.author_id == User.id).join(Post, Comment.post_id == Post.id)
     if post_id:
-        query = query.filter_by(post_id=post_id)
+        query = query.filter(Comment.post_id == post_id)
     if approved_only:
-        query = query.filter_by(is_approved=True)
+        query = query.filter(Comment.is_approved == True)
     
-    comments = query.order_by(desc(Comment.created_at))\
-                  .paginate(page=page, per_page=per_page, error_out=False)
+    comments = WindowPage(query.order_by(desc(Comment.created_at)), page, per_page)
     
     return jsonify({
         'comments': [{
@@ -215,17 +326,17 @@ def get_comments():
             'content': comment.content,
             'is_approved': comment.is_approved,
             'is_spam': comment.is_spam,
-            'created_at': comment.created_at.isoformat(),
-            'updated_at': comment.updated_at.isoformat(),
+            'created_at': comment.created_at,
+            'updated_at': comment.updated_at,
             'author': {
-                'id': comment.author.id,
-                'username': comment.author.username,
-                'full_name': comment.author.full_name
+                'id': comment.author_id,
+                'username': comment.author_username,
+                'full_name': f"{comment.author_first_name} {comment.author_last_name}"
             },
             'post': {
-                'id': comment.post.id,
-                'title': comment.post.title,
-                'slug': comment.post.slug
+                'id': comment.post_id,
+                'title': comment.post_title,
+                'slug': comment.post_slug
             }
         } for comment in comments.items],
         'pagination': {
@@ -238,39 +349,53 @@ def get_comments():
         }
     })
 
+# Statistics statements, one aggregate per table; lambda_stmt caches their
+# construction and compiled SQL across requests
+STATS_STMTS = {
+    'users': lambda_stmt(lambda: select(
+        func.count(User.id).label('total'),
+        func.count(case((User.is_active == True, 1))).label('active'),
+        func.count(case((User.is_admin == True, 1))).label('admins')
+    )),
+    'posts': lambda_stmt(lambda: select(
+        func.count(Post.id).label('total'),
+        func.count(case((Post.is_published == True, 1))).label('published'),
+        func.count(case((Post.is_featured == True, 1))).label('featured')
+    )),
+    'comments': lambda_stmt(lambda: select(
+        func.count(Comment.id).label('total'),
+        func.count(case((Comment.is_approved == True, 1))).label('approved'),
+        func.count(case((Comment.is_approved == False, 1))).label('pending')
+    )),
+    'categories': lambda_stmt(lambda: select(
+        func.count(Category.id).label('total'),
+        func.count(case((Category.is_active == True, 1))).label('active')
+    )),
+}
+
+@cache.cached(timeout=60, key_prefix='api_stats')
+def get_api_stats():
+    """Application statistics, refreshed at most once a minute"""
+    return {name: dict(db.session.execute(stmt).one()._mapping)
+            for name, stmt in STATS_STMTS.items()}
+
 @api_bp.route('/stats')
 @login_required
 def get_stats():
     """Get application statistics (API)"""
-    stats = {
-        'users': {
-            'total': User.query.count(),
-            'active': User.query.filter_by(is_active=True).count(),
-            'admins': User.query.filter_by(is_admin=True).count()
-        },
-        'posts': {
-            'total': Post.query.count(),
-            'published': Post.query.filter_by(is_published=True).count(),
-            'featured': Post.query.filter_by(is_featured=True).count()
-        },
-        'comments': {
-            'total': Comment.query.count(),
-            'approved': Comment.query.filter_by(is_approved=True).count(),
-            'pending': Comment.query.filter_by(is_approved=False).count()
-        },
-        'categories': {
-            'total': Category.query.count(),
-            'active': Category.query.filter_by(is_active=True).count()
-        }
-    }
-    
-    return jsonify(stats)
+    return jsonify(get_api_stats())
 
 @api_bp.route('/user-info')
 @login_required
 def get_user_info():
     """Get current user information (API)"""
-    return jsonify({
+    # Every change to the user row bumps updated_at, logins included
+    etag = request_etag(current_user.id, current_user.updated_at)
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    
+    response = jsonify({
         'id': current_user.id,
         'username': current_user.username,
         'email': current_user.email,
@@ -280,10 +405,12 @@ def get_user_info():
         'is_admin': current_user.is_admin,
         'is_active': current_user.is_active,
         'is_verified': current_user.is_verified,
-        'created_at': current_user.created_at.isoformat(),
-        'last_login': current_user.last_login.isoformat() if current_user.last_login else None,
+        'created_at': current_user.created_at,
+        'last_login': current_user.last_login,
         'login_count': current_user.login_count
     })
+    response.set_etag(etag, weak=True)
+    return response
 
 @api_bp.errorhandler(404)
 def api_not_found(error):
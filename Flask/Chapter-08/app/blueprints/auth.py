@@ -7,7 +7,7 @@ from flask_wtf import FlaskForm
 from wtforms import StringField, PasswordField, BooleanField, SubmitField, TextAreaField
 from wtforms.validators import DataRequired, Email, Length, EqualTo, ValidationError
 from app.models import User
-from app import db
+from app import db, invalidate_stats
 from datetime import datetime
 
 auth_bp = Blueprint('auth', __name__)
@@ -139,6 +139,7 @@ def register():
         
         db.session.add(user)
         db.session.commit()
+        invalidate_stats()
         
         flash('Registration successful! You can now log in.', 'success')
         return redirect(url_for('auth.login'))
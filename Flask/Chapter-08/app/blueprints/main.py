@@ -3,30 +3,47 @@ Main blueprint for general application routes
 """
 from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
 from flask_login import login_required, current_user
-from app.models import User, Post, Category, Comment
-from app import db
-from sqlalchemy import desc, func
+from app.models import User, Post, Category, Comment, post_search_filter
+from app import db, cache
+from sqlalchemy import desc, func, case, select, lambda_stmt
+from sqlalchemy.orm import joinedload, selectinload
 
 main_bp = Blueprint('main', __name__)
 
+def post_list_options():
+    """Loader options joining each post's author and category into the same SELECT
+
+    Built per query: Post.author and Post.category are backrefs that only exist once
+    the mappers are configured, which is after this module is imported.
+    """
+    return (joinedload(Post.author), joinedload(Post.category))
+
+# Home page totals as one statement; lambda_stmt caches its construction and compiled SQL
+HOME_STATS_STMT = lambda_stmt(lambda: select(
+    select(func.count(User.id)).scalar_subquery().label('total_users'),
+    select(func.count(Post.id)).scalar_subquery().label('total_posts'),
+    select(func.count(case((Post.is_published == True, 1)))).scalar_subquery().label('published_posts'),
+    select(func.count(Comment.id)).scalar_subquery().label('total_comments'),
+    select(func.count(Category.id)).scalar_subquery().label('total_categories')
+))
+
+@cache.cached(timeout=60, key_prefix='home_stats')
+def get_home_stats():
+    """Site totals for the home page, refreshed at most once a minute"""
+    return dict(db.session.execute(HOME_STATS_STMT).one()._mapping)
+
 @main_bp.route('/')
 def index():
     """Home page"""
-    stats = {
-        'total_users': User.query.count(),
-        'total_posts': Post.query.count(),
-        'published_posts': Post.query.filter_by(is_published=True).count(),
-        'total_comments': Comment.query.count(),
-        'total_categories': Category.query.count()
-    }
+    stats = get_home_stats()
     
     # Get recent posts
-    recent_posts = Post.query.filter_by(is_published=True)\
+    recent_posts = Post.query.options(*post_list_options()).filter_by(is_published=True)\
                            .order_by(desc(Post.created_at))\
                            .limit(5).all()
     
     # Get popular posts
-    popular_posts = Post.query.filter_by(is_published=True)\
+    popular_posts = Post.query.options(*post_list_options()).filter_by(is_published=True)\
                             .order_by(desc(Post.view_count))\
                             .limit(5).all()
     
@@ -61,14 +78,14 @@ def posts_list():
     category_id = request.args.get('category', type=int)
     search = request.args.get('search', '')
     
-    query = Post.query.filter_by(is_published=True)
+    query = Post.query.options(*post_list_options()).filter_by(is_published=True)
     
     # Apply filters
     if category_id:
         query = query.filter_by(category_id=category_id)
     
     if search:
-        query = query.filter(Post.title.contains(search) | Post.content.contains(search))
+        query = query.filter(post_search_filter(search))
     
     posts = query.order_by(desc(Post.created_at))\
                 .paginate(page=page, per_page=10, error_out=False)
@@ -85,26 +102,37 @@ def posts_list():
 @login_required
 def post_detail(post_id):
     """Post detail page"""
-    post = Post.query.get_or_404(post_id)
-    
-    # Increment view count
-    post.increment_view_count()
+    post = db.get_or_404(Post, post_id)
     
     # Get comments
+    comments_page = request.args.get('comments_page', 1, type=int)
     comments = Comment.query.filter_by(post_id=post_id, is_approved=True)\
-                          .order_by(Comment.created_at.asc()).all()
+                          .options(selectinload(Comment.author))\
+                          .order_by(Comment.created_at.asc())\
+                          .paginate(page=comments_page, per_page=50, error_out=False)
     
-    # Get related posts
-    related_posts = Post.query.filter_by(category_id=post.category_id)\
+    # Get related posts (newest first, read straight off the category index)
+    related_posts = Post.query.filter_by(category_id=post.category_id, is_published=True)\
                             .filter(Post.id != post_id)\
-                            .filter_by(is_published=True)\
+                            .order_by(desc(Post.created_at))\
                             .limit(3).all()
     
-    return render_template('post_detail.html',
+    # Template contract: comments stays a plain list of Comment objects (one page of
+    # them), so `{% if comments %}` and `comments|length` work as before; the
+    # Pagination object for next/prev links is passed separately as comments_pagination
+    page = render_template('post_detail.html',
                          post=post,
-                         comments=comments,
+                         comments=comments.items,
+                         comments_pagination=comments,
                          related_posts=related_posts,
                          title=post.title)
+    
+    # Count the view once the page is built: the write transaction stays short
+    # and committing doesn't expire objects the template still needs
+    post.increment_view_count()
+    db.session.commit()
+    
+    return page
 
 @main_bp.route('/categories')
 def categories_list():
@@ -121,7 +149,7 @@ def categories_list():
 @main_bp.route('/category/<int:category_id>')
 def category_detail(category_id):
     """Category detail page"""
-    category = Category.query.get_or_404(category_id)
+    category = db.get_or_404(Category, category_id)
     
     page = request.args.get('page', 1, type=int)
     posts = Post.query.filter_by(category_id=category_id, is_published=True)\
@@ -143,7 +171,7 @@ def search():
     if query:
         # Search posts
         posts = Post.query.filter_by(is_published=True)\
-                        .filter(Post.title.contains(query) | Post.content.contains(query))\
+                        .filter(post_search_filter(query))\
                         .order_by(desc(Post.created_at))\
                         .paginate(page=page, per_page=10, error_out=False)
         
@@ -193,7 +221,7 @@ def users_list():
 @login_required
 def user_detail(user_id):
     """User detail page"""
-    user = User.query.get_or_404(user_id)
+    user = db.get_or_404(User, user_id)
     
     # Get user's posts
     posts = Post.query.filter_by(author_id=user_id)\
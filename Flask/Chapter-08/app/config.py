@@ -12,6 +12,29 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     PERMANENT_SESSION_LIFETIME = timedelta(hours=24)
     
+    # Database connection pool (server databases only, see configure_engine_options)
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE') or 20)
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW') or 30)
+    DB_POOL_RECYCLE = 1800
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT') or 30)  # seconds to wait for a free connection
+    # Rows per multi-row INSERT ... VALUES statement for bulk inserts
+    DB_INSERT_PAGE_SIZE = 1000
+    
+    # Cache for slow-changing aggregates; SimpleCache is per process, so set
+    # CACHE_TYPE=RedisCache and CACHE_REDIS_URL to share entries between workers
+    CACHE_TYPE = os.environ.get('CACHE_TYPE') or 'SimpleCache'
+    CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL')
+    CACHE_DEFAULT_TIMEOUT = 60
+    
+    # Response compression (Brotli preferred, gzip otherwise); level 4 keeps CPU cost low
+    COMPRESS_ALGORITHM = ['br', 'gzip']
+    COMPRESS_LEVEL = 4
+    COMPRESS_BR_LEVEL = 4
+    COMPRESS_MIN_SIZE = 500
+    COMPRESS_MIMETYPES = ['application/json', 'text/html']
+    # Compressing a streamed response buffers all of it first (/api/posts streams)
+    COMPRESS_STREAMS = False
+    
     # Pagination
     POSTS_PER_PAGE = 10
     USERS_PER_PAGE = 20
@@ -55,11 +78,14 @@ class TestingConfig(Config):
     SQLALCHEMY_DATABASE_URI = os.environ.get('TEST_DATABASE_URL') or \
         f'sqlite:///{os.path.join(basedir, "instance", "test.db")}'
     WTF_CSRF_ENABLED = False
+    CACHE_TYPE = 'NullCache'
 
 class ProductionConfig(Config):
     """Production configuration"""
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or \
         f'sqlite:///{os.path.join(basedir, "instance", "prod.db")}'
+    # Fail fast when the pool is exhausted rather than queueing requests for 30s
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT') or 5)
     
     @classmethod
     def init_app(cls, app):
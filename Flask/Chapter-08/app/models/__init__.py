@@ -5,6 +5,7 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
+from sqlalchemy import DDL, event, false, func, literal_column, or_, text, update
 from app import db
 
 class User(UserMixin, db.Model):
@@ -64,6 +65,7 @@ class Category(db.Model):
     color = db.Column(db.String(7), default='#007bff')
     is_active = db.Column(db.Boolean, default=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
     posts = db.relationship('Post', backref='category', lazy='dynamic')
@@ -96,19 +98,75 @@ class Post(db.Model):
     # Relationships
     comments = db.relationship('Comment', backref='post', lazy='dynamic', cascade='all, delete-orphan')
     
+    __table_args__ = (
+        # Newest published posts, overall and per category, read in index order without a sort
+        db.Index('ix_posts_published_created', 'is_published', created_at.desc()),
+        db.Index('ix_posts_category_published_created', 'category_id', 'is_published', created_at.desc()),
+    )
+    
     def __repr__(self):
         return f'<Post {self.title}>'
     
     @property
     def reading_time(self):
         """Estimate reading time in minutes"""
-        word_count = len(self.content.split())
+        return self.estimate_reading_time(self.content)
+    
+    @staticmethod
+    def estimate_reading_time(content):
+        """Estimate reading time in minutes for a post body"""
+        word_count = len(content.split())
         return max(1, word_count // 200)
     
     def increment_view_count(self):
-        """Increment view count"""
-        self.view_count += 1
-        db.session.commit()
+        """Increment view count with an atomic UPDATE (the caller commits)"""
+        db.session.execute(update(Post).where(Post.id == self.id)
+                                       .values(view_count=Post.view_count + 1))
+
+# Full-text search over post title/content
+# SQLite: an external-content FTS5 table kept in sync by triggers.
+# PostgreSQL: a GIN index on the same to_tsvector() expression the search filter uses.
+POSTS_FTS_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5("
+    "title, content, content='posts', content_rowid='id')",
+    "CREATE TRIGGER posts_fts_ai AFTER INSERT ON posts BEGIN "
+    "INSERT INTO posts_fts(rowid, title, content) VALUES (new.id, new.title, new.content); END",
+    "CREATE TRIGGER posts_fts_ad AFTER DELETE ON posts BEGIN "
+    "INSERT INTO posts_fts(posts_fts, rowid, title, content) "
+    "VALUES ('delete', old.id, old.title, old.content); END",
+    "CREATE TRIGGER posts_fts_au AFTER UPDATE OF title, content ON posts BEGIN "
+    "INSERT INTO posts_fts(posts_fts, rowid, title, content) "
+    "VALUES ('delete', old.id, old.title, old.content); "
+    "INSERT INTO posts_fts(rowid, title, content) VALUES (new.id, new.title, new.content); END",
+)
+POSTS_TSVECTOR_DDL = "CREATE INDEX IF NOT EXISTS ix_posts_tsv ON posts " \
+    "USING gin (to_tsvector('english', title || ' ' || content))"
+
+for statement in POSTS_FTS_DDL:
+    event.listen(Post.__table__, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
+event.listen(Post.__table__, 'before_drop', DDL('DROP TABLE IF EXISTS posts_fts').execute_if(dialect='sqlite'))
+event.listen(Post.__table__, 'after_create', DDL(POSTS_TSVECTOR_DDL).execute_if(dialect='postgresql'))
+
+def post_search_filter(search):
+    """Filter clause matching posts whose title or content contain the search words"""
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'sqlite':
+        words = search.split()
+        if not words:
+            # MATCH '' is an FTS5 syntax error, and a search with no words matches nothing
+            return false()
+        # Every word must match, as a quoted prefix so FTS syntax in user input is inert
+        match = ' '.join('"%s"*' % word.replace('"', '""') for word in words)
+        matching_ids = text('SELECT rowid FROM posts_fts WHERE posts_fts MATCH :match')\
+            .bindparams(match=match)\
+            .columns(rowid=db.Integer)
+        return Post.id.in_(matching_ids)
+    if dialect == 'postgresql':
+        # Spelled exactly like the ix_posts_tsv expression so the GIN index is used
+        document = func.to_tsvector(literal_column("'english'"),
+                                    Post.title.op('||')(literal_column("' '")).op('||')(Post.content))
+        return document.op('@@')(func.plainto_tsquery(literal_column("'english'"), search))
+    return or_(Post.title.contains(search), Post.content.contains(search))
 
 class Comment(db.Model):
     """Comment model"""
@@ -129,5 +187,11 @@ class Comment(db.Model):
     # Relationships
     replies = db.relationship('Comment', backref=db.backref('parent', remote_side=[id]), lazy='dynamic')
     
+    __table_args__ = (
+        # Approved comments newest first, and a post's approved comments in date order
+        db.Index('ix_comments_approved_created', 'is_approved', created_at.desc()),
+        db.Index('ix_comments_post_approved_created', 'post_id', 'is_approved', 'created_at'),
+    )
+    
     def __repr__(self):
         return f'<Comment {self.id}>'
@@ -1,17 +1,16 @@
-from ast import main
-from flask import Flask , render_template , Response, request , globals
+from flask import Flask , render_template , Response, request
 
 app = Flask(__name__)
 
-app.route("/")
+@app.get("/")
 def home() -> Response:
     return "You are currently on home page"
 
-app.route("/dashboard/student/information")
+@app.get("/dashboard/student/information")
 def student_information() -> Response:
     return "This should display the student information"
 
-app.route("/dashboard/teacher/information")
+@app.get("/dashboard/teacher/information")
 def teacher_information() -> Response:
     return "This should display the teacher information"
 